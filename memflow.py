@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+MemFlow: Virtual Memory Manager with TLB Simulation
+Command-Line Entry Point
+
+    python -m memflow                      # launch the Tkinter UI
+    python -m memflow replay trace.txt     # headless trace replay
+"""
+
+import argparse
+import json
+import sys
+from itertools import groupby, repeat
+
+from memflow_analysis import StackDistanceAnalyzer
+from memflow_bench import BENCH_SEED, BENCH_TRACES, compare_results, run_suite
+from memflow_bulk import address_typecode
+from memflow_core import ADDRESS_WIDTHS, ASID_MODES, SWAP_LATENCY, MemFlowCore, TLB_POLICIES, format_stats
+from memflow_metrics import METRIC_FORMATS, Instrumentation, make_exporter
+from memflow_pagetable import FLAT_MAX_PAGES, PAGE_TABLE_LAYOUTS, measure_layout
+from memflow_replacement import REPLACEMENT_POLICIES, make_replacement
+from memflow_sweep import DEFAULT_GRID, expand_grid, load_trace, sweep, write_results
+from memflow_tlb import parse_tlb_spec
+from memflow_trace import convert_text_trace, open_trace_reader, write_binary_trace, write_text_trace
+from memflow_workload import WORKLOAD_PARAMETERS, WORKLOADS, make_workload
+
+
+def cmd_gui(args):
+    """Launch the Tkinter application"""
+    from memflow_main import main as gui_main
+    gui_main(history_capacity=args.history_size, history_spill=args.history_spill)
+    return 0
+
+
+def _segments(addresses, kinds, pids):
+    """Split a trace chunk into (pid, addresses, kinds) runs issued by one process"""
+    if pids is None:
+        yield 0, addresses, kinds
+        return
+    if pids.count(pids[0]) == len(pids):
+        yield pids[0], addresses, kinds
+        return
+    start = 0
+    for pid, run in groupby(pids):
+        end = start + sum(1 for _ in run)
+        yield pid, addresses[start:end], kinds[start:end]
+        start = end
+
+
+def cmd_replay(args):
+    """Stream a trace through the core and print the final statistics"""
+    try:
+        levels = [parse_tlb_spec(spec, args.policy) for spec in args.tlb] if args.tlb else None
+        core = MemFlowCore(tlb_size=args.tlb_size, tlb_policy=args.policy, page_size=args.page_size,
+                           address_bits=args.address_bits, physical_memory_size=args.physical_memory,
+                           page_table_layout=args.page_table, tlb_levels=levels,
+                           tlb_latency=args.tlb_latency, memory_latency=args.memory_latency,
+                           walk_latency=args.walk_latency, asid_mode=args.asid_mode,
+                           page_in_latency=args.page_in_latency, page_out_latency=args.page_out_latency)
+        metrics = None
+        if args.metrics_out or args.profile:
+            metrics = Instrumentation(core, window=args.metrics_window, burst_threshold=args.burst_threshold,
+                                      profile=args.profile)
+            if args.metrics_out:
+                metrics.exporter = make_exporter(args.metrics_format, args.metrics_out)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    # Without --metrics-out/--profile the core is driven directly, at no cost
+    translator = metrics if metrics is not None else core
+
+    trace = open_trace_reader(args.trace, base=16 if args.hex else 10, max_address=core.VIRTUAL_MEMORY_SIZE - 1)
+    try:
+        # Writes dirty pages on either path; only a split L1 needs each
+        # access's kind one by one (to route instruction fetches)
+        split = core.hierarchy is not None and core.hierarchy.l1i is not None
+        chunks = trace.chunks(args.chunk_size, address_typecode(core.ADDRESS_BITS))
+        if args.replacement == "OPT":
+            # OPT is offline: buffer the trace so the policy can see the future
+            chunks = list(chunks)
+            future = ((pid << core.PAGE_BITS) | (addr >> core.PAGE_SHIFT)
+                      for addresses, _, pids in chunks
+                      for addr, pid in zip(addresses, pids or repeat(0)))
+            core.set_replacement(make_replacement("OPT", future))
+        else:
+            core.set_replacement(args.replacement)
+        for chunk in chunks:
+            for pid, addresses, kinds in _segments(*chunk):
+                core.switch_process(pid)
+                if split and kinds is not None:
+                    translator.translate_many(addresses, kinds=kinds)
+                else:
+                    translator.translate_array(addresses, kinds)
+    finally:
+        trace.close()
+        if metrics is not None:
+            metrics.close()
+
+    stats = core.stats()
+    if metrics is not None:
+        stats['fault_bursts'] = metrics.bursts
+    if args.format == "json":
+        stats['skipped_lines'] = trace.skipped
+        print(json.dumps(stats, indent=2))
+    else:
+        print("MemFlow - Virtual Memory Manager Statistics")
+        print("=" * 50)
+        print()
+        for line in format_stats(stats):
+            print(line)
+        for burst in stats.get('fault_bursts', ()):
+            print(f"Fault Burst: accesses {burst['start']}-{burst['end']}, {burst['page_faults']} faults, "
+                  f"peak {burst['peak_fault_rate']:.2f}%")
+    if args.profile:
+        print(metrics.profile_report(), file=sys.stderr)
+    if trace.skipped:
+        print(f"Skipped {trace.skipped} invalid line(s)", file=sys.stderr)
+    return 0
+
+
+def cmd_mrc(args):
+    """Print the LRU miss-ratio curve of a trace from one stack-distance pass"""
+    if args.page_size <= 0 or args.page_size & (args.page_size - 1):
+        print("Error: Page size must be a power of two", file=sys.stderr)
+        return 2
+    shift = args.page_size.bit_length() - 1
+    analyzer = StackDistanceAnalyzer()
+    trace = open_trace_reader(args.trace, base=16 if args.hex else 10, max_address=2**args.address_bits - 1)
+    try:
+        for addresses, _, _ in trace.chunks(args.chunk_size, address_typecode(args.address_bits)):
+            analyzer.feed_array(addresses, shift, args.address_bits)
+    finally:
+        trace.close()
+
+    curve = analyzer.curve()
+    points = curve.points(args.sizes or curve.default_sizes())
+    if args.format == "json":
+        print(json.dumps({
+            'total_accesses': curve.total,
+            'distinct_pages': curve.distinct_pages,
+            'curve': [{'size': size, 'hits': hits, 'hit_rate': hit_rate, 'miss_rate': miss_rate}
+                      for size, hits, hit_rate, miss_rate in points],
+        }, indent=2))
+    else:
+        print(f"Total Accesses: {curve.total}")
+        print(f"Distinct Pages: {curve.distinct_pages}")
+        print()
+        print("Size = LRU TLB entries, or physical frames under LRU replacement")
+        print(f"{'Size':>10} {'Hits':>12} {'Hit Rate':>10} {'Miss Rate':>10}")
+        print("-" * 45)
+        for size, hits, hit_rate, miss_rate in points:
+            print(f"{size:>10} {hits:>12} {hit_rate:>9.2f}% {miss_rate:>9.2f}%")
+    return 0
+
+
+def cmd_pagetable(args):
+    """Measure lookup latency and resident memory of each page table layout"""
+    if args.page_size <= 0 or args.page_size & (args.page_size - 1):
+        print("Error: Page size must be a power of two", file=sys.stderr)
+        return 2
+    shift = args.page_size.bit_length() - 1
+    num_pages = 2**args.address_bits >> shift
+    if "flat" in args.layouts and num_pages > FLAT_MAX_PAGES:
+        print(f"Error: a flat table for {args.address_bits}-bit addresses would need {num_pages} entries", file=sys.stderr)
+        return 2
+    trace = open_trace_reader(args.trace, base=16 if args.hex else 10, max_address=2**args.address_bits - 1)
+    try:
+        pages = [addr >> shift for addr in trace]
+    finally:
+        trace.close()
+
+    results = [measure_layout(layout, pages, num_pages) for layout in args.layouts]
+    if args.format == "json":
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'Layout':<10} {'Entries':>10} {'Resident Bytes':>16} {'Lookup (ns)':>12}")
+        print("-" * 51)
+        for r in results:
+            print(f"{r['layout']:<10} {r['entries']:>10} {r['resident_bytes']:>16} {r['lookup_ns']:>12.1f}")
+    return 0
+
+
+def cmd_sweep(args):
+    """Simulate a trace under every combination of the given parameters"""
+    grid = {
+        'tlb_size': args.tlb_sizes,
+        'tlb_policy': args.policies,
+        'page_size': args.page_sizes,
+        'replacement': args.replacements,
+        'physical_memory_size': [args.physical_memory],
+        'address_bits': [args.address_bits],
+    }
+    try:
+        for config in expand_grid(grid):
+            MemFlowCore(**config)  # reject bad combinations before starting workers
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    trace = load_trace(args.trace, base=16 if args.hex else 10, address_bits=args.address_bits)
+    rows = sweep(trace, grid, workers=args.workers)
+
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            write_results(rows, f, args.format)
+    else:
+        write_results(rows, sys.stdout, args.format)
+    return 0
+
+
+def cmd_convert(args):
+    """Convert a text trace to the memory-mappable binary format"""
+    count, skipped = convert_text_trace(args.trace, args.output, base=16 if args.hex else 10,
+                                        address_bits=args.address_bits, chunk_size=args.chunk_size)
+    print(f"Wrote {count} accesses to {args.output}")
+    if skipped:
+        print(f"Skipped {skipped} invalid line(s)", file=sys.stderr)
+    return 0
+
+
+def cmd_generate(args):
+    """Write a seeded synthetic workload as a binary or text trace"""
+    options = {'address_bits': args.address_bits, 'page_size': args.page_size,
+               'write_ratio': args.write_ratio, 'seed': args.seed}
+    for name in WORKLOAD_PARAMETERS[args.pattern]:
+        value = getattr(args, name)
+        if value is not None:
+            options[name] = value
+    try:
+        workload = make_workload(args.pattern, args.count, **options)
+        chunks = workload.chunks(args.chunk_size)
+    except (ValueError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    if args.format == "text":
+        count = write_text_trace(args.output, chunks)
+    else:
+        count = write_binary_trace(args.output, chunks, args.address_bits)
+    print(f"Wrote {count} {args.pattern} accesses to {args.output} (seed {workload.seed})")
+    return 0
+
+
+def cmd_bench(args):
+    """Benchmark the core on the standard traces and optionally compare with a baseline"""
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    shown = []
+
+    def show(r):
+        if not shown:
+            print(f"{'Trace':<11} {'Policy':<6} {'Layout':<6} {'Scalar acc/s':>13} {'Bulk acc/s':>13} "
+                  f"{'p50 ns':>8} {'p99 ns':>8} {'Peak RSS MB':>12}")
+            print("-" * 84)
+        shown.append(r)
+        bulk = f"{r['bulk_accesses_per_sec']:>13,.0f}" if r['bulk_accesses_per_sec'] else f"{'-':>13}"
+        rss = f"{r['peak_rss_bytes'] / 2**20:>12.1f}" if r['peak_rss_bytes'] is not None else f"{'-':>12}"
+        print(f"{r['trace']:<11} {r['tlb_policy']:<6} {r['page_table_layout']:<6} "
+              f"{r['scalar_accesses_per_sec']:>13,.0f} {bulk} {r['latency_p50_ns']:>8} {r['latency_p99_ns']:>8} {rss}",
+              flush=True)
+
+    try:
+        report = run_suite(args.traces, args.policies, args.layouts, accesses=args.accesses,
+                           latency_samples=args.latency_samples, repeat=args.repeat,
+                           seed=args.seed, isolate=not args.no_isolate, progress=show)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if baseline is None:
+        return 0
+    rows = compare_results(report, baseline, args.threshold)
+    regressions = [row for row in rows if row[-1]]
+    print()
+    print(f"Compared with {args.compare}: {len(regressions)} regression(s) beyond {args.threshold:g}%")
+    for trace, policy, layout, metric, before, after, change, _ in regressions:
+        delta = f"{change:+.1f}%" if change is not None else "changed"
+        print(f"  {trace}/{policy}/{layout} {metric}: {before} -> {after} ({delta})")
+    return 1 if regressions else 0
+
+
+def positive_int(text):
+    """argparse type for counts that must be at least 1"""
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return value
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="memflow", description="MemFlow - Virtual Memory Manager with TLB Simulation")
+    parser.add_argument("--history-size", type=int, default=10000, help="accesses kept in the UI history buffer (default: 10000)")
+    parser.add_argument("--history-spill", metavar="PATH", help="append history that falls out of the buffer to this file")
+    parser.set_defaults(func=cmd_gui)
+    subparsers = parser.add_subparsers(dest="command")
+
+    replay = subparsers.add_parser("replay", help="replay an address trace without the UI")
+    replay.add_argument("trace", help="binary trace, or text trace with one [pid:]address [R|W|I] per line ('-' for stdin)")
+    replay.add_argument("--tlb-size", type=int, default=16, help="number of TLB entries (default: 16)")
+    replay.add_argument("--policy", choices=TLB_POLICIES, default="FIFO", help="TLB replacement policy (default: FIFO)")
+    replay.add_argument("--tlb", action="append", metavar="SPEC",
+                        help="add a TLB level NAME=ENTRIES[xWAYS][@LATENCY], NAME one of L1, L1D, L1I, L2 "
+                             "(repeatable; e.g. --tlb L1D=64x4@1 --tlb L1I=128x8@1 --tlb L2=1536x12@7); "
+                             "replaces --tlb-size")
+    replay.add_argument("--asid-mode", choices=ASID_MODES, default="flush",
+                        help="on a context switch, flush the TLB or keep PID-tagged entries (default: flush)")
+    replay.add_argument("--tlb-latency", type=int, default=1, help="single-level TLB lookup cost in cycles (default: 1)")
+    replay.add_argument("--memory-latency", type=int, default=100, help="memory access cost in cycles (default: 100)")
+    replay.add_argument("--walk-latency", type=int, help="page walk cost in cycles (default: one memory access per radix level)")
+    replay.add_argument("--page-in-latency", type=int, default=SWAP_LATENCY,
+                        help=f"cost of reading a faulted page from swap, in cycles (default: {SWAP_LATENCY})")
+    replay.add_argument("--page-out-latency", type=int, default=SWAP_LATENCY,
+                        help=f"cost of writing a dirty victim to swap, in cycles (default: {SWAP_LATENCY})")
+    replay.add_argument("--metrics-out", metavar="TARGET",
+                        help="export live metrics to a file, - (stdout), tcp://HOST:PORT or unix://PATH")
+    replay.add_argument("--metrics-format", choices=METRIC_FORMATS, default="jsonl",
+                        help="jsonl: one record per window; prometheus: text exposition, rewritten per window (default: jsonl)")
+    replay.add_argument("--metrics-window", type=int, default=100_000,
+                        help="accesses per time-series window (default: 100000)")
+    replay.add_argument("--burst-threshold", type=float, default=0.05,
+                        help="fault rate at which a window counts toward a fault burst (default: 0.05)")
+    replay.add_argument("--profile", action="store_true",
+                        help="run the simulator under cProfile and print the hottest functions to stderr")
+    replay.add_argument("--replacement", choices=REPLACEMENT_POLICIES, default="FIFO", help="page replacement policy; OPT buffers the whole trace (default: FIFO)")
+    replay.add_argument("--physical-memory", type=int, default=2**24, help="physical memory size in bytes (default: 16MB)")
+    replay.add_argument("--page-table", choices=PAGE_TABLE_LAYOUTS, default="dict", help="page table layout (default: dict)")
+    replay.add_argument("--page-size", type=int, default=4096, help="page size in bytes (default: 4096)")
+    replay.add_argument("--address-bits", type=int, choices=ADDRESS_WIDTHS, default=32, help="virtual address width (default: 32)")
+    replay.add_argument("--hex", action="store_true", help="parse bare addresses as hex (0x-prefixed are always hex)")
+    replay.add_argument("--chunk-size", type=positive_int, default=1 << 20, help="addresses decoded per bulk batch (default: 1048576)")
+    replay.add_argument("--format", choices=("text", "json"), default="text", help="summary output format (default: text)")
+    replay.set_defaults(func=cmd_replay)
+
+    sweep_parser = subparsers.add_parser("sweep", help="run a trace under a grid of configurations in parallel")
+    sweep_parser.add_argument("trace", help="binary trace, or text trace with one address per line ('-' for stdin)")
+    sweep_parser.add_argument("--tlb-sizes", type=int, nargs="+", default=DEFAULT_GRID['tlb_size'], help="TLB sizes to try (default: 8 16 ... 1024)")
+    sweep_parser.add_argument("--policies", nargs="+", choices=TLB_POLICIES, default=DEFAULT_GRID['tlb_policy'], help="TLB policies to try (default: FIFO LRU)")
+    sweep_parser.add_argument("--page-sizes", type=int, nargs="+", default=DEFAULT_GRID['page_size'], help="page sizes to try (default: 4096)")
+    sweep_parser.add_argument("--address-bits", type=int, choices=ADDRESS_WIDTHS, default=32, help="virtual address width (default: 32)")
+    sweep_parser.add_argument("--replacements", nargs="+", choices=("FIFO", "LRU", "Clock"), default=["FIFO"], help="page replacement policies to try (default: FIFO)")
+    sweep_parser.add_argument("--physical-memory", type=int, default=2**24, help="physical memory size in bytes (default: 16MB)")
+    sweep_parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    sweep_parser.add_argument("--hex", action="store_true", help="parse bare addresses as hex (0x-prefixed are always hex)")
+    sweep_parser.add_argument("--format", choices=("csv", "json"), default="csv", help="results format (default: csv)")
+    sweep_parser.add_argument("--output", "-o", help="write results here instead of stdout")
+    sweep_parser.set_defaults(func=cmd_sweep)
+
+    mrc = subparsers.add_parser("mrc", help="LRU miss-ratio curve for every TLB/memory size in one pass")
+    mrc.add_argument("trace", help="binary trace, or text trace with one address per line ('-' for stdin)")
+    mrc.add_argument("--sizes", type=int, nargs="+", help="sizes to report (default: powers of two)")
+    mrc.add_argument("--page-size", type=int, default=4096, help="page size in bytes (default: 4096)")
+    mrc.add_argument("--address-bits", type=int, choices=ADDRESS_WIDTHS, default=32, help="virtual address width (default: 32)")
+    mrc.add_argument("--hex", action="store_true", help="parse bare addresses as hex (0x-prefixed are always hex)")
+    mrc.add_argument("--chunk-size", type=positive_int, default=1 << 20, help="addresses decoded per bulk batch (default: 1048576)")
+    mrc.add_argument("--format", choices=("text", "json"), default="text", help="output format (default: text)")
+    mrc.set_defaults(func=cmd_mrc)
+
+    pagetable = subparsers.add_parser("pagetable", help="compare page table layouts on a trace")
+    pagetable.add_argument("trace", help="binary trace, or text trace with one address per line ('-' for stdin)")
+    pagetable.add_argument("--layouts", nargs="+", choices=PAGE_TABLE_LAYOUTS, default=list(PAGE_TABLE_LAYOUTS), help="layouts to measure (default: all)")
+    pagetable.add_argument("--page-size", type=int, default=4096, help="page size in bytes (default: 4096)")
+    pagetable.add_argument("--address-bits", type=int, choices=ADDRESS_WIDTHS, default=32, help="virtual address width (default: 32)")
+    pagetable.add_argument("--hex", action="store_true", help="parse bare addresses as hex (0x-prefixed are always hex)")
+    pagetable.add_argument("--format", choices=("text", "json"), default="text", help="output format (default: text)")
+    pagetable.set_defaults(func=cmd_pagetable)
+
+    generate = subparsers.add_parser("generate", help="write a seeded synthetic workload trace")
+    generate.add_argument("pattern", choices=WORKLOADS, help="access pattern")
+    generate.add_argument("output", help="trace file to write")
+    generate.add_argument("--count", "-n", type=int, default=1_000_000, help="number of accesses (default: 1000000)")
+    generate.add_argument("--seed", type=int, help="random seed; the same seed gives the same trace (default: random, printed)")
+    generate.add_argument("--write-ratio", type=float, default=0.0, help="fraction of accesses tagged as writes (default: 0)")
+    generate.add_argument("--address-bits", type=int, choices=ADDRESS_WIDTHS, default=32, help="virtual address width (default: 32)")
+    generate.add_argument("--page-size", type=int, default=4096, help="page size in bytes (default: 4096)")
+    generate.add_argument("--stride", type=int, help="sequential/strided/loop: bytes between accesses (default: 8 / page size / 64)")
+    generate.add_argument("--region", type=int, help="uniform/sequential/strided/loop: bytes covered before wrapping (default: address space, loop: 1MB)")
+    generate.add_argument("--base", type=int, help="uniform/sequential/strided/loop: first address of the region (default: 0)")
+    generate.add_argument("--pages", type=int, help="zipf: number of distinct pages (default: 65536, capped at the address space)")
+    generate.add_argument("--s", type=float, dest="s", help="zipf: exponent (default: 1.0)")
+    generate.add_argument("--working-set", type=int, help="phases: pages per phase (default: 64)")
+    generate.add_argument("--phase-length", type=int, help="phases: accesses per phase (default: 100000)")
+    generate.add_argument("--format", choices=("binary", "text"), default="binary", help="trace format (default: binary)")
+    generate.add_argument("--chunk-size", type=positive_int, default=1 << 20, help="accesses generated per batch (default: 1048576)")
+    generate.set_defaults(func=cmd_generate)
+
+    bench = subparsers.add_parser("bench", help="benchmark translation throughput, latency and memory")
+    bench.add_argument("--traces", nargs="+", choices=BENCH_TRACES, default=list(BENCH_TRACES), help="standard traces to run (default: all)")
+    bench.add_argument("--policies", nargs="+", choices=TLB_POLICIES, default=list(TLB_POLICIES), help="TLB policies (default: all)")
+    bench.add_argument("--layouts", nargs="+", choices=PAGE_TABLE_LAYOUTS, default=list(PAGE_TABLE_LAYOUTS), help="page table layouts (default: all)")
+    bench.add_argument("--accesses", type=int, default=1_000_000, help="accesses per trace (default: 1000000)")
+    bench.add_argument("--latency-samples", type=int, default=100_000, help="accesses timed one by one for percentiles (default: 100000)")
+    bench.add_argument("--repeat", type=int, default=3, help="throughput passes; the best is kept (default: 3)")
+    bench.add_argument("--seed", type=int, default=BENCH_SEED, help=f"seed for the synthetic traces (default: {BENCH_SEED})")
+    bench.add_argument("--no-isolate", action="store_true", help="run every configuration in this process (faster; peak RSS becomes cumulative)")
+    bench.add_argument("--output", "-o", help="save the results as JSON")
+    bench.add_argument("--compare", metavar="BASELINE", help="compare with a saved JSON run; exit 1 on regressions")
+    bench.add_argument("--threshold", type=float, default=10.0, help="percent slowdown/growth counted as a regression (default: 10)")
+    bench.set_defaults(func=cmd_bench)
+
+    convert = subparsers.add_parser("convert", help="convert a text trace to the binary trace format")
+    convert.add_argument("trace", help="text trace file ('-' for stdin)")
+    convert.add_argument("output", help="binary trace to write")
+    convert.add_argument("--address-bits", type=int, choices=ADDRESS_WIDTHS, default=32, help="virtual address width (default: 32)")
+    convert.add_argument("--hex", action="store_true", help="parse bare addresses as hex (0x-prefixed are always hex)")
+    convert.add_argument("--chunk-size", type=positive_int, default=1 << 20, help="accesses written per batch (default: 1048576)")
+    convert.set_defaults(func=cmd_convert)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except ValueError as e:  # e.g. a malformed binary trace
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+MemFlow: Virtual Memory Manager with TLB Simulation
+Stack-Distance (Miss-Ratio Curve) Analysis
+
+LRU has the inclusion property: an LRU cache of size k always holds the k
+most recently used pages. An access therefore hits in every LRU structure
+larger than its stack distance (the number of distinct pages touched since
+the previous access to the same page). One pass collecting the distance
+histogram gives the LRU TLB hit rate for every TLB_SIZE, and the page fault
+rate under LRU replacement for every number of physical frames.
+"""
+
+from memflow_bulk import HAVE_NUMPY, page_runs
+
+
+class FenwickTree:
+    """Binary indexed tree over positions 1..size with prefix sums"""
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, index, delta):
+        tree = self.tree
+        size = self.size
+        while index <= size:
+            tree[index] += delta
+            index += index & -index
+
+    def prefix_sum(self, index):
+        tree = self.tree
+        total = 0
+        while index > 0:
+            total += tree[index]
+            index &= index - 1
+        return total
+
+
+class StackDistanceAnalyzer:
+    """Accumulate the LRU stack-distance histogram of a page stream
+
+    Each distinct page holds a mark at the timestamp of its latest access;
+    the distance of a reuse is the number of marks after its previous
+    timestamp. Timestamps are renumbered whenever they run out, so the tree
+    stays O(M) in the number of distinct pages and each access is O(log M).
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.histogram = []  # histogram[d]: accesses with stack distance d
+        self.cold = 0        # first-touch accesses (infinite distance)
+        self.total = 0
+        self.last_seen = {}  # {page: timestamp of its latest access}
+        self.tree = FenwickTree(1024)
+        self.clock = 0
+        self.last_page = None
+
+    def _compact(self):
+        """Renumber live timestamps to 1..M and size the tree for 2M"""
+        order = sorted(self.last_seen, key=self.last_seen.get)
+        self.tree = FenwickTree(max(2 * len(order), 1024))
+        for timestamp, page in enumerate(order, 1):
+            self.last_seen[page] = timestamp
+            self.tree.add(timestamp, 1)
+        self.clock = len(order)
+
+    def feed_runs(self, pages, counts):
+        """Add runs of consecutive accesses: pages[i] touched counts[i] times"""
+        histogram = self.histogram
+        last_seen = self.last_seen
+        last_page = self.last_page
+        accesses = cold = repeats = 0
+
+        for page, count in zip(pages, counts):
+            accesses += count
+            if page == last_page:
+                repeats += count
+                continue
+            repeats += count - 1
+            last_page = page
+
+            if self.clock == self.tree.size:
+                self._compact()
+            tree = self.tree
+            self.clock += 1
+            now = self.clock
+
+            previous = last_seen.get(page)
+            if previous is None:
+                cold += 1
+            else:
+                distance = tree.prefix_sum(now - 1) - tree.prefix_sum(previous)
+                if distance >= len(histogram):
+                    histogram.extend([0] * (distance + 1 - len(histogram)))
+                histogram[distance] += 1
+                tree.add(previous, -1)
+            tree.add(now, 1)
+            last_seen[page] = now
+
+        if repeats:
+            if not histogram:
+                histogram.append(0)
+            histogram[0] += repeats
+        self.cold += cold
+        self.total += accesses
+        self.last_page = last_page
+
+    def feed(self, addresses, page_shift=12):
+        """Add an iterable of virtual addresses"""
+        pages = [addr >> page_shift for addr in addresses]
+        self.feed_runs(pages, [1] * len(pages))
+
+    def feed_array(self, addresses, page_shift=12, address_bits=32):
+        """Bulk path: vectorized decode and run collapsing, like translate_array"""
+        if not HAVE_NUMPY:
+            self.feed(addresses, page_shift)
+            return
+        pages, counts = page_runs(addresses, page_shift, address_bits)
+        self.feed_runs(pages, counts)
+
+    def curve(self):
+        """Snapshot the histogram as a MissRatioCurve"""
+        return MissRatioCurve(self.histogram, self.cold, self.total)
+
+
+class MissRatioCurve:
+    """LRU hit/miss counts for every cache size, from a distance histogram"""
+
+    def __init__(self, histogram, cold, total):
+        self.cold = cold
+        self.total = total
+        self.distinct_pages = cold
+        # cumulative[k]: accesses with distance < k, i.e. hits in a size-k LRU
+        self.cumulative = [0]
+        running = 0
+        for count in histogram:
+            running += count
+            self.cumulative.append(running)
+
+    def hits(self, size):
+        """LRU hits with `size` entries (TLB entries or physical frames)"""
+        size = max(0, min(size, len(self.cumulative) - 1))
+        return self.cumulative[size]
+
+    def hit_rate(self, size):
+        return (self.hits(size) / self.total * 100) if self.total > 0 else 0
+
+    def miss_rate(self, size):
+        return (100 - self.hit_rate(size)) if self.total > 0 else 0
+
+    def points(self, sizes):
+        """[(size, hits, hit_rate, miss_rate)] for each size"""
+        return [(size, self.hits(size), self.hit_rate(size), self.miss_rate(size)) for size in sizes]
+
+    def default_sizes(self):
+        """Powers of two up to the size that captures every reuse"""
+        sizes = [1]
+        while sizes[-1] < max(len(self.cumulative) - 1, 1):
+            sizes.append(sizes[-1] * 2)
+        return sizes
@@ -0,0 +1,208 @@
+"""
+MemFlow: Virtual Memory Manager with TLB Simulation
+Translation Benchmark Suite
+
+Runs the core over a fixed set of traces for every TLB policy and page
+table layout, reporting throughput, single-access latency percentiles and
+peak RSS. Results are plain JSON so a later run can be compared against a
+saved baseline.
+"""
+
+import os
+import platform
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from memflow_bulk import HAVE_NUMPY, np
+from memflow_core import TLB_POLICIES, MemFlowCore
+from memflow_pagetable import PAGE_TABLE_LAYOUTS
+from memflow_trace import read_addresses
+from memflow_workload import make_workload
+
+try:
+    import resource
+except ImportError:  # not available on Windows; RSS is reported as None
+    resource = None
+
+BENCH_TRACES = ("addresses", "random", "sequential", "zipf")
+BENCH_SEED = 1
+SAMPLE_TRACE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "memflow_addresses.txt")
+PERCENTILES = (50, 90, 99, 99.9)
+# (metric, True if higher is better) checked by compare_results
+COMPARED_METRICS = (
+    ('scalar_accesses_per_sec', True),
+    ('bulk_accesses_per_sec', True),
+    ('latency_p50_ns', False),
+    ('latency_p99_ns', False),
+    ('peak_rss_bytes', False),
+)
+
+
+def bench_trace(name, accesses, seed=BENCH_SEED):
+    """Build one of the standard traces as a packed 32-bit address array
+
+    "addresses" is the bundled sample file, repeated to the requested
+    length; the others are seeded synthetic workloads.
+    """
+    if name == "addresses":
+        sample = array('I', read_addresses(SAMPLE_TRACE))
+        repeats = -(-accesses // len(sample))
+        return (sample * repeats)[:accesses]
+    if name not in BENCH_TRACES:
+        raise ValueError(f"Unknown benchmark trace: {name}")
+    workload = make_workload("uniform" if name == "random" else name, accesses, seed=seed)
+    addresses = array('I')
+    for chunk, _, _ in workload.chunks():
+        addresses.frombytes(chunk.astype('<u4').tobytes())
+    return addresses
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KB
+
+
+def _percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_benchmark(config):
+    """Measure one configuration; run_suite calls this in a fresh process
+
+    Throughput is the best of `repeat` passes, each on a new core.
+    Latency is measured per core.translate() call (the path the UI uses) on
+    the first `latency_samples` accesses, minus the timer's own overhead.
+    """
+    addresses = bench_trace(config['trace'], config['accesses'], config['seed'])
+    rss_before = peak_rss()
+    options = {'tlb_policy': config['tlb_policy'], 'page_table_layout': config['page_table_layout']}
+
+    scalar = bulk = None
+    for _ in range(config['repeat']):
+        core = MemFlowCore(**options)
+        start = time.perf_counter()
+        core.translate_many(addresses)
+        elapsed = time.perf_counter() - start
+        scalar = elapsed if scalar is None else min(scalar, elapsed)
+    stats = core.stats()
+    if HAVE_NUMPY:
+        for _ in range(config['repeat']):
+            core = MemFlowCore(**options)
+            start = time.perf_counter()
+            core.translate_array(addresses)
+            elapsed = time.perf_counter() - start
+            bulk = elapsed if bulk is None else min(bulk, elapsed)
+
+    clock = time.perf_counter_ns
+    overhead = min(-(clock() - clock()) for _ in range(1000))
+    core = MemFlowCore(**options)
+    translate = core.translate
+    samples = array('q')
+    for virtual_address in addresses[:config['latency_samples']]:
+        start = clock()
+        translate(virtual_address)
+        samples.append(clock() - start - overhead)
+    ordered = sorted(samples)
+
+    result = dict(config)
+    del result['repeat']
+    result.update({
+        'scalar_accesses_per_sec': len(addresses) / scalar if scalar else None,
+        'bulk_accesses_per_sec': len(addresses) / bulk if bulk else None,
+        'tlb_hits': stats['tlb_hits'],
+        'page_faults': stats['page_faults'],
+        'tlb_hit_rate': stats['tlb_hit_rate'],
+        'page_fault_rate': stats['page_fault_rate'],
+        'peak_rss_bytes': peak_rss(),
+        'rss_growth_bytes': peak_rss() - rss_before if rss_before is not None else None,
+    })
+    for pct in PERCENTILES:
+        result[f"latency_p{pct:g}_ns".replace(".", "")] = _percentile(ordered, pct) if ordered else None
+    result['latency_max_ns'] = ordered[-1] if ordered else None
+    return result
+
+
+def run_suite(traces=BENCH_TRACES, policies=TLB_POLICIES, layouts=PAGE_TABLE_LAYOUTS,
+              accesses=1_000_000, latency_samples=100_000, repeat=3, seed=BENCH_SEED,
+              isolate=True, progress=None):
+    """Benchmark every trace x TLB policy x layout combination
+
+    With isolate (the default) each configuration runs alone in a freshly
+    spawned process, so its peak RSS is its own and earlier runs cannot warm
+    its caches or fragment its heap. progress(result) is called after each.
+    """
+    if not HAVE_NUMPY and set(traces) - {"addresses"}:
+        raise RuntimeError("Synthetic benchmark traces require NumPy")
+    results = []
+    for trace in traces:
+        for policy in policies:
+            for layout in layouts:
+                config = {'trace': trace, 'tlb_policy': policy, 'page_table_layout': layout,
+                          'accesses': accesses, 'latency_samples': latency_samples,
+                          'repeat': repeat, 'seed': seed}
+                if isolate:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                        result = pool.submit(run_benchmark, config).result()
+                else:
+                    result = run_benchmark(config)
+                results.append(result)
+                if progress is not None:
+                    progress(result)
+    return {'meta': environment(accesses, seed, isolate), 'results': results}
+
+
+def environment(accesses, seed, isolate):
+    """Describe the machine and settings a run was made with"""
+    return {
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'numpy': np.__version__ if HAVE_NUMPY else None,
+        'accesses': accesses,
+        'seed': seed,
+        'isolated': isolate,
+    }
+
+
+def _key(result):
+    return result['trace'], result['tlb_policy'], result['page_table_layout']
+
+
+def compare_results(current, baseline, threshold=10.0):
+    """Compare two run_suite() outputs
+
+    Returns a list of (trace, policy, layout, metric, old, new, change %,
+    regressed) rows. A metric regresses when it is more than threshold
+    percent worse. A change in the simulated hit or fault counts is always a
+    regression, since the same seeded trace must give the same answer. Peak
+    RSS is only compared between runs with the same process isolation.
+    """
+    old_results = {_key(result): result for result in baseline['results']}
+    same_isolation = current['meta'].get('isolated') == baseline['meta'].get('isolated')
+    rows = []
+    for result in current['results']:
+        old = old_results.get(_key(result))
+        if old is None:
+            continue
+        same_trace = old.get('accesses') == result['accesses'] and old.get('seed') == result['seed']
+        for field in ('tlb_hits', 'page_faults'):
+            if same_trace and old.get(field) != result[field]:
+                rows.append((*_key(result), field, old.get(field), result[field], None, True))
+        for metric, higher_is_better in COMPARED_METRICS:
+            if metric == 'peak_rss_bytes' and not same_isolation:
+                continue
+            before, after = old.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100
+            worse = -change if higher_is_better else change
+            rows.append((*_key(result), metric, before, after, change, worse > threshold))
+    return rows
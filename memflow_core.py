@@ -0,0 +1,746 @@
+"""
+MemFlow: Virtual Memory Manager with TLB Simulation
+Headless Translation Core
+"""
+
+from array import array
+from collections import OrderedDict, deque, namedtuple
+from itertools import repeat
+
+from memflow_bulk import HAVE_NUMPY, address_bounds, page_runs, write_mask
+from memflow_pagetable import (PTE_DIRTY, PTE_FLAG_BITS, PTE_MAX_FRAMES, PTE_REFERENCED, PTE_VALID,
+                               UNMAPPED, make_page_table)
+from memflow_replacement import ReplacementPolicy, make_replacement
+from memflow_tlb import TLBHierarchy, build_hierarchy
+
+TLB_POLICIES = ("FIFO", "LRU")
+PAGE_SIZES = (4096, 16384, 65536, 2**21)  # 4K, 16K, 64K and 2M huge pages
+ADDRESS_WIDTHS = (32, 48, 64)
+READ, WRITE, FETCH = "R", "W", "I"  # access kinds; FETCH is an instruction fetch
+ASID_MODES = ("flush", "tagged")
+ASID_BITS = 16
+LOADED_PTE = PTE_VALID | PTE_REFERENCED  # flags of a freshly faulted-in page
+SWAP_LATENCY = 100_000  # default page-in/page-out cost in cycles, about one SSD access
+
+
+class AccessResult(namedtuple('AccessResult', ['virtual', 'page', 'offset', 'physical', 'frame', 'tlb_hit', 'page_fault'])):
+    """Outcome of a single address translation"""
+    __slots__ = ()
+
+    @property
+    def status(self):
+        if self.page_fault:
+            return "PAGE FAULT"
+        return "TLB HIT" if self.tlb_hit else "TLB MISS"
+
+
+class Process:
+    """One address space: its page table and per-process counters"""
+
+    def __init__(self, pid, page_table):
+        self.pid = pid
+        self.page_table = page_table
+        self.accesses = 0
+        self.tlb_hits = 0
+        self.tlb_misses = 0
+        self.page_faults = 0
+        self.writes = 0
+        self.evicted = 0  # its pages evicted, by any process's fault
+        self.page_outs = 0  # of those, the dirty ones written back
+
+    def stats(self):
+        accesses = self.accesses
+        return {
+            'pid': self.pid,
+            'total_accesses': accesses,
+            'tlb_hits': self.tlb_hits,
+            'tlb_misses': self.tlb_misses,
+            'tlb_hit_rate': (self.tlb_hits / accesses * 100) if accesses > 0 else 0,
+            'page_faults': self.page_faults,
+            'page_fault_rate': (self.page_faults / accesses * 100) if accesses > 0 else 0,
+            'pages_in_memory': len(self.page_table),
+            'evicted': self.evicted,
+            'writes': self.writes,
+            'page_outs': self.page_outs,
+        }
+
+
+class MemFlowCore:
+    """UI-free simulator: TLB, page table and frame allocation"""
+
+    def __init__(self, tlb_size=16, tlb_policy="FIFO", page_size=4096,
+                 address_bits=32, physical_memory_size=2**24, replacement="FIFO",
+                 page_table_layout="dict", tlb_levels=None, tlb_latency=1,
+                 memory_latency=100, walk_latency=None, asid_mode="flush",
+                 page_in_latency=SWAP_LATENCY, page_out_latency=SWAP_LATENCY):
+        if tlb_policy not in TLB_POLICIES:
+            raise ValueError(f"Unknown TLB policy: {tlb_policy}")
+        if page_size <= 0 or page_size & (page_size - 1):
+            raise ValueError("Page size must be a power of two")
+        if address_bits not in ADDRESS_WIDTHS:
+            raise ValueError(f"Address width must be one of {', '.join(map(str, ADDRESS_WIDTHS))} bits")
+        if page_size >= 2**address_bits:
+            raise ValueError("Page size must be smaller than the virtual address space")
+        if physical_memory_size < page_size:
+            raise ValueError("Physical memory must hold at least one page")
+        if physical_memory_size // page_size > PTE_MAX_FRAMES:
+            raise ValueError(f"Physical memory must not exceed {PTE_MAX_FRAMES} frames")
+        if tlb_size <= 0:
+            raise ValueError("TLB size must be positive")
+        if asid_mode not in ASID_MODES:
+            raise ValueError(f"ASID mode must be one of {', '.join(ASID_MODES)}")
+        if min(tlb_latency, memory_latency, walk_latency or 0, page_in_latency, page_out_latency) < 0:
+            raise ValueError("Latencies must not be negative")
+
+        # Memory Configuration (shift/mask are derived once here, never hard-coded)
+        self.PAGE_SIZE = page_size
+        self.ADDRESS_BITS = address_bits
+        self.VIRTUAL_MEMORY_SIZE = 2**address_bits
+        self.PHYSICAL_MEMORY_SIZE = physical_memory_size
+        self.NUM_PAGES = self.VIRTUAL_MEMORY_SIZE // self.PAGE_SIZE
+        self.NUM_FRAMES = self.PHYSICAL_MEMORY_SIZE // self.PAGE_SIZE
+        self.TLB_SIZE = tlb_size
+        self.PAGE_SHIFT = page_size.bit_length() - 1
+        self.OFFSET_MASK = page_size - 1
+        self.PAGE_BITS = address_bits - self.PAGE_SHIFT
+        self.asid_mode = asid_mode
+
+        # Cycle costs for EMAT; a walk defaults to one memory read per level
+        # of a radix table with 10-bit levels over the page-number bits
+        self.tlb_latency = tlb_latency
+        self.memory_latency = memory_latency
+        if walk_latency is None:
+            walk_latency = -(-self.PAGE_BITS // 10) * memory_latency
+        self.walk_latency = walk_latency
+        # The backing store (swap): every fault reads the page in, and a dirty
+        # victim is written out first
+        self.page_in_latency = page_in_latency
+        self.page_out_latency = page_out_latency
+
+        # Optional multi-level TLB; None keeps the single OrderedDict TLB
+        if tlb_levels is not None and not isinstance(tlb_levels, TLBHierarchy):
+            tlb_levels = build_hierarchy(tlb_levels)
+        self.hierarchy = tlb_levels
+        if tlb_levels is not None:
+            self.TLB_SIZE = sum(level.entries for level in tlb_levels.levels)
+            tlb_policy = tlb_levels.l1d.policy
+
+        self.tlb_policy = tlb_policy
+        self.page_table_layout = page_table_layout
+        if not isinstance(replacement, ReplacementPolicy):
+            replacement = make_replacement(replacement)
+        self.replacement = replacement
+        # Optional listener with page_fault(pid, page, frame) and
+        # evicted(pid, page, frame, dirty); only the fault path checks it
+        self.observer = None
+        self.reset()
+
+    def reset(self):
+        """Clear all data structures and statistics"""
+        # Data Structures
+        # TLB and replacement policy entries are keyed by (pid << PAGE_BITS) | page,
+        # which is just the page number for process 0
+        self.tlb = OrderedDict()  # {key: frame_number}
+        if self.hierarchy is not None:
+            self.hierarchy.reset()
+        self.physical_memory = array('q', [UNMAPPED]) * self.NUM_FRAMES  # frame_number -> page_number
+        self.frame_owner = array('i', [0]) * self.NUM_FRAMES  # frame_number -> pid
+        self.free_frames = deque(range(self.NUM_FRAMES))
+        self.replacement.reset(self.NUM_FRAMES)
+        self.processes = {}  # {pid: Process}
+
+        # Statistics
+        self.total_accesses = 0
+        self.tlb_hits = 0
+        self.tlb_misses = 0
+        self.page_faults = 0
+        self.evictions = 0
+        self.page_outs = 0  # dirty evictions written to the backing store
+        self.context_switches = 0
+        self.writes = 0
+        self.dirty_pages = 0  # resident pages with the dirty bit set
+
+        self.pid = None
+        self.switch_process(0)
+
+    def _process(self, pid):
+        process = self.processes.get(pid)
+        if process is None:
+            if not 0 <= pid < 2**ASID_BITS:
+                raise ValueError(f"Process ID must be between 0 and {2**ASID_BITS - 1}")
+            page_table = make_page_table(self.page_table_layout, self.NUM_PAGES)  # page_number -> packed PTE
+            process = self.processes[pid] = Process(pid, page_table)
+        return process
+
+    def _range_error(self, page_number):
+        return ValueError(f"Page {page_number} is outside the {self.ADDRESS_BITS}-bit virtual address space")
+
+    def _settle(self):
+        """Credit the counters since the last switch to the running process"""
+        process = self.processes.get(self.pid)
+        if process is not None:
+            mark = self._mark
+            process.accesses += self.total_accesses - mark[0]
+            process.tlb_hits += self.tlb_hits - mark[1]
+            process.tlb_misses += self.tlb_misses - mark[2]
+            process.page_faults += self.page_faults - mark[3]
+            process.writes += self.writes - mark[4]
+        self._mark = (self.total_accesses, self.tlb_hits, self.tlb_misses, self.page_faults, self.writes)
+
+    def switch_process(self, pid):
+        """Make pid the running process (a context switch if it changes)
+
+        In "flush" mode the TLB is emptied, as on hardware without ASIDs;
+        in "tagged" mode entries carry the pid and survive the switch.
+        """
+        if pid == self.pid:
+            return
+        process = self._process(pid)
+        self._settle()
+        self.pid = pid
+        self.asid = pid << self.PAGE_BITS
+        self.page_table = process.page_table
+        if not self.total_accesses:
+            return  # nothing has run yet, so there is nothing to switch out
+        self.context_switches += 1
+        if self.asid_mode == "flush":
+            self.tlb.clear()
+            if self.hierarchy is not None:
+                self.hierarchy.flush()
+
+    def set_replacement(self, replacement):
+        """Switch page replacement policy, keeping the pages already resident"""
+        if not isinstance(replacement, ReplacementPolicy):
+            replacement = make_replacement(replacement)
+        replacement.reset(self.NUM_FRAMES)
+        for frame, page in enumerate(self.physical_memory):
+            if page != UNMAPPED:
+                replacement.loaded((self.frame_owner[frame] << self.PAGE_BITS) | page, frame)
+        self.replacement = replacement
+
+    def translate(self, virtual_address):
+        """Translate a single address and return its AccessResult"""
+        return self.translate_many((virtual_address,), collect=True)[0]
+
+    def translate_many(self, addresses, collect=False, kinds=None):
+        """Translate an iterable of addresses in one pass
+
+        Returns a list of AccessResult when collect is True; otherwise only
+        the aggregate counters are updated, which keeps long traces cheap.
+        kinds optionally gives each address's access kind ('R', 'W' or 'I');
+        writes set the page's dirty bit, and instruction fetches only matter
+        to a hierarchy with a split L1I.
+        """
+        if self.hierarchy is not None:
+            return self._translate_levels(addresses, collect, kinds)
+        if kinds is not None:
+            return self._translate_kinds(addresses, collect, kinds)
+        shift = self.PAGE_SHIFT
+        mask = self.OFFSET_MASK
+        tlb = self.tlb
+        lru = self.tlb_policy == "LRU"
+        miss = self._tlb_miss
+        touch = self.replacement.access if self.replacement.tracks_access else None
+        asid = self.asid
+        num_pages = self.NUM_PAGES
+        results = [] if collect else None
+
+        accesses = hits = 0
+        last_page = None
+        frame_number = None
+        try:
+            for virtual_address in addresses:
+                page_number = virtual_address >> shift
+                page_fault = False
+
+                if page_number == last_page:
+                    # Same page as the previous access: guaranteed TLB hit
+                    hits += 1
+                    tlb_hit = True
+                else:
+                    if not 0 <= page_number < num_pages:
+                        raise self._range_error(page_number)
+                    # Check TLB first
+                    key = page_number | asid
+                    frame_number = tlb.get(key)
+                    tlb_hit = frame_number is not None
+                    if tlb_hit:
+                        hits += 1
+                        if lru:
+                            tlb.move_to_end(key)
+                        if touch is not None:
+                            touch(key, frame_number)
+                    else:
+                        frame_number, page_fault = miss(page_number)
+                    last_page = page_number
+                accesses += 1
+
+                if collect:
+                    offset = virtual_address & mask
+                    results.append(AccessResult(virtual_address, page_number, offset,
+                                                (frame_number << shift) | offset,
+                                                frame_number, tlb_hit, page_fault))
+        finally:
+            self.total_accesses += accesses
+            self.tlb_hits += hits
+            self.tlb_misses += accesses - hits
+
+        return results
+
+    def _translate_kinds(self, addresses, collect, kinds):
+        """translate_many for accesses with kinds through the single TLB"""
+        shift = self.PAGE_SHIFT
+        mask = self.OFFSET_MASK
+        tlb = self.tlb
+        lru = self.tlb_policy == "LRU"
+        miss = self._tlb_miss
+        mark_dirty = self._mark_dirty
+        touch = self.replacement.access if self.replacement.tracks_access else None
+        asid = self.asid
+        num_pages = self.NUM_PAGES
+        results = [] if collect else None
+
+        accesses = hits = writes = 0
+        last_page = last_dirty = None
+        frame_number = None
+        try:
+            for virtual_address, kind in zip(addresses, kinds):
+                page_number = virtual_address >> shift
+                page_fault = False
+
+                if page_number == last_page:
+                    hits += 1
+                    tlb_hit = True
+                else:
+                    if not 0 <= page_number < num_pages:
+                        raise self._range_error(page_number)
+                    key = page_number | asid
+                    frame_number = tlb.get(key)
+                    tlb_hit = frame_number is not None
+                    if tlb_hit:
+                        hits += 1
+                        if lru:
+                            tlb.move_to_end(key)
+                        if touch is not None:
+                            touch(key, frame_number)
+                    else:
+                        frame_number, page_fault = miss(page_number)
+                        if page_fault:
+                            last_dirty = None  # the fault may have evicted it
+                    last_page = page_number
+                accesses += 1
+
+                if kind == WRITE:
+                    writes += 1
+                    if page_number != last_dirty:
+                        mark_dirty(page_number)
+                        last_dirty = page_number
+
+                if collect:
+                    offset = virtual_address & mask
+                    results.append(AccessResult(virtual_address, page_number, offset,
+                                                (frame_number << shift) | offset,
+                                                frame_number, tlb_hit, page_fault))
+        finally:
+            self.total_accesses += accesses
+            self.tlb_hits += hits
+            self.tlb_misses += accesses - hits
+            self.writes += writes
+
+        return results
+
+    def _translate_levels(self, addresses, collect, kinds):
+        """translate_many through the multi-level TLB hierarchy"""
+        shift = self.PAGE_SHIFT
+        mask = self.OFFSET_MASK
+        hierarchy = self.hierarchy
+        walk = self._walk
+        mark_dirty = self._mark_dirty
+        touch = self.replacement.access if self.replacement.tracks_access else None
+        asid = self.asid
+        num_pages = self.NUM_PAGES
+        results = [] if collect else None
+        if kinds is None:
+            kinds = repeat(READ)
+
+        accesses = hits = writes = 0
+        last_page = last_l1 = last_dirty = None
+        frame_number = None
+        try:
+            for virtual_address, kind in zip(addresses, kinds):
+                page_number = virtual_address >> shift
+                fetch = kind == FETCH
+                l1 = hierarchy.l1_for(fetch)
+                page_fault = False
+
+                if page_number == last_page and l1 is last_l1:
+                    # Same page through the same L1: guaranteed L1 hit
+                    l1.hits += 1
+                    hits += 1
+                    tlb_hit = True
+                else:
+                    if not 0 <= page_number < num_pages:
+                        raise self._range_error(page_number)
+                    key = page_number | asid
+                    frame_number = hierarchy.lookup(key, fetch)
+                    tlb_hit = frame_number is not None
+                    if tlb_hit:
+                        hits += 1
+                        if touch is not None:
+                            touch(key, frame_number)
+                    else:
+                        frame_number, page_fault = walk(page_number)
+                        hierarchy.fill(key, frame_number, fetch)
+                        if page_fault:
+                            last_dirty = None
+                    last_page = page_number
+                    last_l1 = l1
+                accesses += 1
+
+                if kind == WRITE:
+                    writes += 1
+                    if page_number != last_dirty:
+                        mark_dirty(page_number)
+                        last_dirty = page_number
+
+                if collect:
+                    offset = virtual_address & mask
+                    results.append(AccessResult(virtual_address, page_number, offset,
+                                                (frame_number << shift) | offset,
+                                                frame_number, tlb_hit, page_fault))
+        finally:
+            self.total_accesses += accesses
+            self.tlb_hits += hits
+            self.tlb_misses += accesses - hits
+            self.writes += writes
+
+        return results
+
+    def translate_runs(self, pages, counts, writes=None):
+        """Translate pre-decoded runs of accesses to the same page
+
+        pages[i] was accessed counts[i] times in a row; only the first access
+        of each run goes through the TLB/page-table logic, the rest are hits.
+        writes[i], if given, is how many of those accesses were writes; the
+        page stays resident for the whole run, so any write dirties it.
+        """
+        if self.hierarchy is not None:
+            self._translate_runs_levels(pages, counts, writes)
+            return
+        if writes is not None:
+            self._translate_runs_writes(pages, counts, writes)
+            return
+        tlb = self.tlb
+        lru = self.tlb_policy == "LRU"
+        miss = self._tlb_miss
+        touch = self.replacement.access if self.replacement.tracks_access else None
+        asid = self.asid
+        num_pages = self.NUM_PAGES
+
+        accesses = hits = 0
+        try:
+            for page_number, count in zip(pages, counts):
+                if not 0 <= page_number < num_pages:
+                    raise self._range_error(page_number)
+                accesses += count
+                key = page_number | asid
+                frame_number = tlb.get(key)
+                if frame_number is not None:
+                    hits += count
+                    if lru:
+                        tlb.move_to_end(key)
+                    if touch is not None:
+                        touch(key, frame_number)
+                else:
+                    miss(page_number)
+                    hits += count - 1
+        finally:
+            self.total_accesses += accesses
+            self.tlb_hits += hits
+            self.tlb_misses += accesses - hits
+
+    def _translate_runs_writes(self, pages, counts, writes):
+        """translate_runs with per-run write counts through the single TLB"""
+        tlb = self.tlb
+        lru = self.tlb_policy == "LRU"
+        miss = self._tlb_miss
+        mark_dirty = self._mark_dirty
+        touch = self.replacement.access if self.replacement.tracks_access else None
+        asid = self.asid
+        num_pages = self.NUM_PAGES
+
+        accesses = hits = write_count = 0
+        try:
+            for page_number, count, written in zip(pages, counts, writes):
+                if not 0 <= page_number < num_pages:
+                    raise self._range_error(page_number)
+                accesses += count
+                key = page_number | asid
+                frame_number = tlb.get(key)
+                if frame_number is not None:
+                    hits += count
+                    if lru:
+                        tlb.move_to_end(key)
+                    if touch is not None:
+                        touch(key, frame_number)
+                else:
+                    miss(page_number)
+                    hits += count - 1
+                if written:
+                    write_count += written
+                    mark_dirty(page_number)
+        finally:
+            self.total_accesses += accesses
+            self.tlb_hits += hits
+            self.tlb_misses += accesses - hits
+            self.writes += write_count
+
+    def _translate_runs_levels(self, pages, counts, writes):
+        """translate_runs through the hierarchy; run repeats are L1 hits"""
+        hierarchy = self.hierarchy
+        l1 = hierarchy.l1d
+        walk = self._walk
+        mark_dirty = self._mark_dirty
+        touch = self.replacement.access if self.replacement.tracks_access else None
+        asid = self.asid
+        num_pages = self.NUM_PAGES
+
+        accesses = hits = write_count = 0
+        try:
+            for page_number, count, written in zip(pages, counts, repeat(0) if writes is None else writes):
+                if not 0 <= page_number < num_pages:
+                    raise self._range_error(page_number)
+                accesses += count
+                key = page_number | asid
+                frame_number = hierarchy.lookup(key)
+                if frame_number is not None:
+                    hits += count
+                    if touch is not None:
+                        touch(key, frame_number)
+                else:
+                    frame_number, _ = walk(page_number)
+                    hierarchy.fill(key, frame_number)
+                    hits += count - 1
+                l1.hits += count - 1
+                if written:
+                    write_count += written
+                    mark_dirty(page_number)
+        finally:
+            self.total_accesses += accesses
+            self.tlb_hits += hits
+            self.tlb_misses += accesses - hits
+            self.writes += write_count
+
+    def translate_array(self, addresses, kinds=None):
+        """Bulk path: decode a whole address array at once, then translate its runs
+
+        Only the writes among kinds are used here; instruction fetches
+        through a split L1I need translate_many.
+        """
+        if not HAVE_NUMPY:
+            self.translate_many(addresses, kinds=kinds)
+            return
+        bounds = address_bounds(addresses)
+        if bounds is not None and not (bounds[0] >= 0 and bounds[1] < self.VIRTUAL_MEMORY_SIZE):
+            raise self._range_error((bounds[1] if bounds[0] >= 0 else bounds[0]) >> self.PAGE_SHIFT)
+        if kinds is None:
+            pages, counts = page_runs(addresses, self.PAGE_SHIFT, self.ADDRESS_BITS)
+            self.translate_runs(pages, counts)
+            return
+        pages, counts, writes = page_runs(addresses, self.PAGE_SHIFT, self.ADDRESS_BITS, write_mask(kinds))
+        self.translate_runs(pages, counts, writes)
+
+    def _tlb_miss(self, page_number):
+        """Walk the page table (faulting if needed) and refill the TLB"""
+        frame_number, page_fault = self._walk(page_number)
+        tlb = self.tlb
+        if len(tlb) >= self.TLB_SIZE:
+            tlb.popitem(last=False)  # Remove oldest (FIFO) or LRU
+        tlb[page_number | self.asid] = frame_number
+        return frame_number, page_fault
+
+    def _walk(self, page_number):
+        """Look up the page table, faulting the page in if needed"""
+        replacement = self.replacement
+        key = page_number | self.asid
+        page_fault = False
+        entry = self.page_table.get(page_number)
+        if entry is None:
+            # Page fault - allocate a free frame, or evict a victim page
+            page_fault = True
+            self.page_faults += 1
+            if self.free_frames:
+                frame_number = self.free_frames.popleft()
+            else:
+                # The victim may belong to any process
+                victim = replacement.evict()
+                owner = self.processes[victim >> self.PAGE_BITS]
+                victim_entry = owner.page_table.pop(victim & (self.NUM_PAGES - 1))
+                frame_number = victim_entry >> PTE_FLAG_BITS
+                owner.evicted += 1
+                if victim_entry & PTE_DIRTY:
+                    # A modified page is written back before its frame is reused
+                    self.page_outs += 1
+                    owner.page_outs += 1
+                    self.dirty_pages -= 1
+                if self.hierarchy is not None:
+                    self.hierarchy.invalidate(victim)
+                else:
+                    self.tlb.pop(victim, None)
+                self.evictions += 1
+                if self.observer is not None:
+                    self.observer.evicted(owner.pid, victim & (self.NUM_PAGES - 1), frame_number,
+                                          bool(victim_entry & PTE_DIRTY))
+            self.page_table[page_number] = (frame_number << PTE_FLAG_BITS) | LOADED_PTE
+            self.physical_memory[frame_number] = page_number
+            self.frame_owner[frame_number] = self.pid
+            replacement.loaded(key, frame_number)
+            if self.observer is not None:
+                self.observer.page_fault(self.pid, page_number, frame_number)
+        else:
+            frame_number = entry >> PTE_FLAG_BITS
+            if not entry & PTE_REFERENCED:
+                self.page_table[page_number] = entry | PTE_REFERENCED
+            if replacement.tracks_access:
+                replacement.access(key, frame_number)
+        return frame_number, page_fault
+
+    def _mark_dirty(self, page_number):
+        """Set the dirty bit of a resident page of the running process"""
+        entry = self.page_table.get(page_number)
+        if not entry & PTE_DIRTY:
+            self.page_table[page_number] = entry | PTE_DIRTY
+            self.dirty_pages += 1
+
+    def clear_referenced(self):
+        """Clear every resident page's referenced bit; returns how many were set
+
+        This is the sampling step of a working-set scan. The TLB is flushed as
+        well, since a walk (a TLB miss) is what sets the bit again.
+        """
+        referenced = 0
+        for frame, page in enumerate(self.physical_memory):
+            if page == UNMAPPED:
+                continue
+            page_table = self.processes[self.frame_owner[frame]].page_table
+            entry = page_table.get(page)
+            if entry & PTE_REFERENCED:
+                referenced += 1
+                page_table[page] = entry & ~PTE_REFERENCED
+        self.tlb.clear()
+        if self.hierarchy is not None:
+            self.hierarchy.flush()
+        return referenced
+
+    def cycles(self):
+        """Total simulated cycles, derived from the counters (nothing per access)
+
+        Every access pays the TLB lookup(s) and the memory access itself;
+        every TLB miss adds a page walk, every page fault a page-in, and
+        every dirty eviction a page-out.
+        """
+        if self.hierarchy is not None:
+            lookups = self.hierarchy.cycles()
+        else:
+            lookups = self.total_accesses * self.tlb_latency
+        return (lookups + self.total_accesses * self.memory_latency
+                + self.tlb_misses * self.walk_latency + self.page_faults * self.page_in_latency
+                + self.page_outs * self.page_out_latency)
+
+    def level_stats(self):
+        """Per-level counters of the TLB hierarchy (empty without one)"""
+        if self.hierarchy is None:
+            return []
+        return [{
+            'name': level.name,
+            'entries': level.entries,
+            'ways': level.ways,
+            'organization': level.organization,
+            'policy': level.policy,
+            'latency': level.latency,
+            'hits': level.hits,
+            'misses': level.misses,
+            'hit_rate': (level.hits / (level.hits + level.misses) * 100) if level.hits + level.misses else 0,
+        } for level in self.hierarchy.levels]
+
+    def stats(self):
+        """Aggregate counters as a plain dict"""
+        total = self.total_accesses
+        cycles = self.cycles()
+        self._settle()
+        return {
+            'total_accesses': total,
+            'tlb_hits': self.tlb_hits,
+            'tlb_misses': self.tlb_misses,
+            'tlb_hit_rate': (self.tlb_hits / total * 100) if total > 0 else 0,
+            'page_faults': self.page_faults,
+            'page_fault_rate': (self.page_faults / total * 100) if total > 0 else 0,
+            'tlb_entries': len(self.hierarchy if self.hierarchy is not None else self.tlb),
+            'tlb_size': self.TLB_SIZE,
+            'pages_in_memory': self.NUM_FRAMES - len(self.free_frames),
+            'page_table_layout': self.page_table_layout,
+            'page_size': self.PAGE_SIZE,
+            'address_bits': self.ADDRESS_BITS,
+            'evictions': self.evictions,
+            'tlb_policy': self.tlb_policy,
+            'replacement_policy': self.replacement.name,
+            'tlb_levels': self.level_stats(),
+            'walk_latency': self.walk_latency,
+            'memory_latency': self.memory_latency,
+            'writes': self.writes,
+            'dirty_pages': self.dirty_pages,
+            'page_ins': self.page_faults,
+            'page_outs': self.page_outs,
+            'page_in_latency': self.page_in_latency,
+            'page_out_latency': self.page_out_latency,
+            'total_cycles': cycles,
+            'emat': (cycles / total) if total > 0 else 0,
+            'asid_mode': self.asid_mode,
+            'context_switches': self.context_switches,
+            'processes': [self.processes[pid].stats() for pid in sorted(self.processes)
+                          if self.processes[pid].accesses],
+        }
+
+
+def format_stats(stats):
+    """Render a stats() dict as the lines used by the statistics export"""
+    lines = [
+        f"Total Memory Accesses: {stats['total_accesses']}",
+        f"TLB Hits: {stats['tlb_hits']}",
+        f"TLB Misses: {stats['tlb_misses']}",
+        f"TLB Hit Rate: {stats['tlb_hit_rate']:.2f}%",
+        f"Page Faults: {stats['page_faults']}",
+        f"Page Fault Rate: {stats['page_fault_rate']:.2f}%",
+        f"TLB Size: {stats['tlb_entries']}/{stats['tlb_size']}",
+        f"Pages in Memory: {stats['pages_in_memory']}",
+        f"Page Evictions: {stats['evictions']}",
+        f"Writes: {stats['writes']}",
+        f"Dirty Pages in Memory: {stats['dirty_pages']}",
+        f"Page-Ins: {stats['page_ins']}",
+        f"Page-Outs: {stats['page_outs']} ({stats['evictions'] - stats['page_outs']} clean evictions)",
+        f"Page Table Layout: {stats['page_table_layout']}",
+        f"Page Size: {stats['page_size']} bytes",
+        f"Address Width: {stats['address_bits']} bits",
+        f"TLB Replacement Policy: {stats['tlb_policy']}",
+        f"Page Replacement Policy: {stats['replacement_policy']}",
+    ]
+    for level in stats['tlb_levels']:
+        lines.append(f"{level['name']} TLB ({level['entries']} entries, {level['organization']}, "
+                     f"{level['latency']} cycles): {level['hits']} hits, {level['misses']} misses, "
+                     f"{level['hit_rate']:.2f}% hit rate")
+    lines += [
+        f"Page Walk Latency: {stats['walk_latency']} cycles",
+        f"Memory Latency: {stats['memory_latency']} cycles",
+        f"Page-In Latency: {stats['page_in_latency']} cycles",
+        f"Page-Out Latency: {stats['page_out_latency']} cycles",
+        f"Effective Memory Access Time: {stats['emat']:.2f} cycles",
+    ]
+    if len(stats['processes']) > 1:
+        lines.append(f"Context Switches: {stats['context_switches']} (TLB {stats['asid_mode']} on switch)")
+        for process in stats['processes']:
+            lines.append(f"PID {process['pid']}: {process['total_accesses']} accesses, "
+                         f"{process['tlb_hit_rate']:.2f}% TLB hit rate, "
+                         f"{process['page_faults']} page faults ({process['page_fault_rate']:.2f}%), "
+                         f"{process['pages_in_memory']} pages in memory, "
+                         f"{process['evicted']} evicted ({process['page_outs']} dirty)")
+    return lines
@@ -0,0 +1,125 @@
+"""
+MemFlow: Virtual Memory Manager with TLB Simulation
+Bounded Access History
+"""
+
+import struct
+from array import array
+
+from memflow_core import AccessResult
+
+TLB_HIT_FLAG = 1
+PAGE_FAULT_FLAG = 2
+
+# time, virtual, page, offset, physical, frame, flags
+SPILL_RECORD = struct.Struct('<dQQQQqB')
+SPILL_FLUSH_BYTES = 1 << 16
+
+
+class AccessHistory:
+    """Fixed-capacity columnar ring buffer of translated accesses
+
+    Each field lives in its own packed array, so memory stays at a few dozen
+    bytes per slot no matter how long the simulation runs. Once full, the
+    oldest records are overwritten, or appended to spill_path first when a
+    spill file is given, so the complete history can still be streamed back.
+    """
+
+    def __init__(self, capacity=10000, spill_path=None):
+        if capacity <= 0:
+            raise ValueError("History capacity must be positive")
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.spill_file = open(spill_path, 'w+b') if spill_path else None
+        self.clear()
+
+    def clear(self):
+        """Drop every record, including anything already spilled"""
+        capacity = self.capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.virtual = array('Q', bytes(8 * capacity))
+        self.page = array('Q', bytes(8 * capacity))
+        self.offset = array('Q', bytes(8 * capacity))
+        self.physical = array('Q', bytes(8 * capacity))
+        self.frame = array('q', bytes(8 * capacity))
+        self.flags = array('B', bytes(capacity))
+        self.next = 0        # slot the next record goes into
+        self.count = 0       # records currently held in memory
+        self.total = 0       # records ever appended
+        self.spilled = 0     # records written to the spill file
+        self.pending = bytearray()
+        if self.spill_file:
+            self.spill_file.seek(0)
+            self.spill_file.truncate()
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, result):
+        """Record one AccessResult taken at timestamp (seconds since the epoch)"""
+        slot = self.next
+        if self.count == self.capacity:
+            if self.spill_file:
+                self._spill(slot)
+        else:
+            self.count += 1
+        self.times[slot] = timestamp
+        self.virtual[slot] = result.virtual
+        self.page[slot] = result.page
+        self.offset[slot] = result.offset
+        self.physical[slot] = result.physical
+        self.frame[slot] = result.frame
+        self.flags[slot] = (TLB_HIT_FLAG if result.tlb_hit else 0) | (PAGE_FAULT_FLAG if result.page_fault else 0)
+        self.next = (slot + 1) % self.capacity
+        self.total += 1
+
+    def extend(self, timestamp, results):
+        """Record a batch of AccessResults sharing one timestamp"""
+        for result in results:
+            self.append(timestamp, result)
+
+    def _spill(self, slot):
+        self.pending += SPILL_RECORD.pack(self.times[slot], self.virtual[slot], self.page[slot], self.offset[slot],
+                                          self.physical[slot], self.frame[slot], self.flags[slot])
+        self.spilled += 1
+        if len(self.pending) >= SPILL_FLUSH_BYTES:
+            self._flush()
+
+    def _flush(self):
+        self.spill_file.seek(0, 2)
+        self.spill_file.write(self.pending)
+        self.pending.clear()
+
+    def _record(self, slot):
+        flags = self.flags[slot]
+        return self.times[slot], AccessResult(self.virtual[slot], self.page[slot], self.offset[slot], self.physical[slot],
+                                              self.frame[slot], bool(flags & TLB_HIT_FLAG), bool(flags & PAGE_FAULT_FLAG))
+
+    def tail(self, n):
+        """The newest n (timestamp, AccessResult) pairs, oldest first"""
+        n = min(n, self.count)
+        start = (self.next - n) % self.capacity
+        return [self._record((start + i) % self.capacity) for i in range(n)]
+
+    def __iter__(self):
+        """Stream every (timestamp, AccessResult) pair, spilled ones first"""
+        if self.spill_file:
+            self._flush()
+            self.spill_file.flush()
+            self.spill_file.seek(0)
+            while True:
+                block = self.spill_file.read(SPILL_RECORD.size * 4096)
+                if not block:
+                    break
+                for t, virtual, page, offset, physical, frame, flags in SPILL_RECORD.iter_unpack(block):
+                    yield t, AccessResult(virtual, page, offset, physical, frame,
+                                          bool(flags & TLB_HIT_FLAG), bool(flags & PAGE_FAULT_FLAG))
+
+        start = (self.next - self.count) % self.capacity
+        for i in range(self.count):
+            yield self._record((start + i) % self.capacity)
+
+    def close(self):
+        if self.spill_file:
+            self.spill_file.close()
+            self.spill_file = None
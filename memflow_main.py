@@ -5,40 +5,61 @@ Main Application File
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
+import queue
 import random
-from collections import OrderedDict
+import threading
+import time
 from datetime import datetime
+from itertools import chain
+
+from memflow_analysis import StackDistanceAnalyzer
+from memflow_bulk import HAVE_NUMPY
+from memflow_core import ADDRESS_WIDTHS, PAGE_SIZES, MemFlowCore, format_stats
+from memflow_history import AccessHistory
+from memflow_pagetable import pte_flags, pte_frame
+from memflow_trace import read_addresses
+from memflow_worker import SimulationWorker
+from memflow_workload import WORKLOADS, make_workload
+
+HISTORY_VIEW_ROWS = 200
+MAX_RANDOM_COUNT = 10_000_000
+FRAME_MS = 50  # panel refresh interval while a simulation runs (20 fps)
+WORKER_CHUNK = 4096
+STEP_DELAY = 0.1
+PAGE_SIZE_LABELS = {4096: "4 KB", 16384: "16 KB", 65536: "64 KB", 2**21: "2 MB"}
+MRC_WIDTH = 260
+MRC_HEIGHT = 140
+MRC_MAX_LOG2 = 10  # plot TLB sizes 1..1024
+HISTORY_HEADER = f"{'Time':<20} {'Virtual Addr':<15} {'Page':<10} {'Offset':<10} {'Physical Addr':<15} {'Frame':<10} {'TLB':<10} {'Status':<15}\n" + "-" * 140 + "\n"
+
+
+def format_time(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime("%H:%M:%S.%f")[:-3]
+
 
 class MemFlow:
-    def __init__(self, root):
+    def __init__(self, root, history_capacity=10000, history_spill=None):
         self.root = root
         self.root.title("MemFlow - Virtual Memory Manager")
         self.root.geometry("1400x900")
         self.root.configure(bg='#1e1e1e')
         
-        # Memory Configuration
-        self.PAGE_SIZE = 4096  # 4KB
-        self.VIRTUAL_MEMORY_SIZE = 2**32  # 4GB
-        self.PHYSICAL_MEMORY_SIZE = 2**24  # 16MB
-        self.NUM_PAGES = self.VIRTUAL_MEMORY_SIZE // self.PAGE_SIZE
-        self.NUM_FRAMES = self.PHYSICAL_MEMORY_SIZE // self.PAGE_SIZE
-        self.TLB_SIZE = 16
-        
-        # Data Structures
-        self.page_table = {}  # {page_number: frame_number}
-        self.tlb = OrderedDict()  # {page_number: frame_number}
-        self.physical_memory = [None] * self.NUM_FRAMES
-        self.free_frames = list(range(self.NUM_FRAMES))
-        
-        # Statistics
-        self.total_accesses = 0
-        self.tlb_hits = 0
-        self.tlb_misses = 0
-        self.page_faults = 0
-        self.tlb_policy = "FIFO"  # or "LRU"
-        
-        # History
-        self.access_history = []
+        # Simulator core (all translation state lives here)
+        self.core = MemFlowCore()
+        
+        # History (bounded ring buffer; only the newest rows are rendered)
+        self.access_history = AccessHistory(history_capacity, history_spill)
+        
+        # Stack-distance histogram of every access, for the miss-ratio curve
+        self.analyzer = StackDistanceAnalyzer()
+        
+        # Background simulation: the worker holds `lock` while it mutates the
+        # core/history and posts progress to `events`, drained every FRAME_MS
+        self.lock = threading.Lock()
+        self.events = queue.Queue()
+        self.worker = None
+        self.worker_total = None
+        self.worker_done_message = None
         
         self.create_ui()
         
@@ -103,6 +124,11 @@ class MemFlow:
         
         ttk.Button(control_frame, text="Generate & Run", command=self.generate_random).grid(row=2, column=2, padx=5)
         
+        # Synthetic patterns need NumPy; without it only uniform random is offered
+        self.pattern_var = tk.StringVar(value="uniform")
+        ttk.Combobox(control_frame, textvariable=self.pattern_var, values=list(WORKLOADS) if HAVE_NUMPY else ["uniform"],
+                     state="readonly", width=10).grid(row=3, column=2, padx=5)
+        
         # File Input
         ttk.Button(control_frame, text="Load Address File", command=self.load_file).grid(row=3, column=0, columnspan=2, pady=10, sticky=(tk.W, tk.E))
         
@@ -113,12 +139,41 @@ class MemFlow:
         policy_combo.grid(row=4, column=1, pady=5)
         policy_combo.bind("<<ComboboxSelected>>", self.change_policy)
         
+        # Page Replacement Policy (OPT needs the whole trace up front, so it is CLI-only)
+        ttk.Label(control_frame, text="Page Replacement:").grid(row=5, column=0, sticky=tk.W, pady=5)
+        self.replacement_var = tk.StringVar(value="FIFO")
+        replacement_combo = ttk.Combobox(control_frame, textvariable=self.replacement_var, values=["FIFO", "LRU", "Clock"], state="readonly", width=18)
+        replacement_combo.grid(row=5, column=1, pady=5)
+        replacement_combo.bind("<<ComboboxSelected>>", self.change_replacement)
+        
+        # Page Size and Address Width (changing either rebuilds the core)
+        ttk.Label(control_frame, text="Page Size:").grid(row=6, column=0, sticky=tk.W, pady=5)
+        self.page_size_var = tk.StringVar(value=PAGE_SIZE_LABELS[self.core.PAGE_SIZE])
+        page_size_combo = ttk.Combobox(control_frame, textvariable=self.page_size_var, values=[PAGE_SIZE_LABELS[size] for size in PAGE_SIZES], state="readonly", width=18)
+        page_size_combo.grid(row=6, column=1, pady=5)
+        page_size_combo.bind("<<ComboboxSelected>>", self.change_memory_config)
+        
+        ttk.Label(control_frame, text="Address Width:").grid(row=7, column=0, sticky=tk.W, pady=5)
+        self.address_bits_var = tk.StringVar(value=f"{self.core.ADDRESS_BITS}-bit")
+        address_combo = ttk.Combobox(control_frame, textvariable=self.address_bits_var, values=[f"{bits}-bit" for bits in ADDRESS_WIDTHS], state="readonly", width=18)
+        address_combo.grid(row=7, column=1, pady=5)
+        address_combo.bind("<<ComboboxSelected>>", self.change_memory_config)
+        
         # Reset Button
-        ttk.Button(control_frame, text="Reset All", command=self.reset_all).grid(row=5, column=0, columnspan=3, pady=10, sticky=(tk.W, tk.E))
+        ttk.Button(control_frame, text="Reset All", command=self.reset_all).grid(row=8, column=0, columnspan=3, pady=10, sticky=(tk.W, tk.E))
         
         # Step-by-step mode
         self.step_mode = tk.BooleanVar(value=False)
-        ttk.Checkbutton(control_frame, text="Step-by-Step Mode", variable=self.step_mode).grid(row=6, column=0, columnspan=3, pady=5)
+        ttk.Checkbutton(control_frame, text="Step-by-Step Mode", variable=self.step_mode).grid(row=9, column=0, columnspan=3, pady=5)
+        
+        # Simulation Controls
+        self.pause_button = ttk.Button(control_frame, text="Pause", command=self.toggle_pause, state=tk.DISABLED)
+        self.pause_button.grid(row=10, column=0, pady=5, sticky=(tk.W, tk.E))
+        self.cancel_button = ttk.Button(control_frame, text="Cancel", command=self.cancel_simulation, state=tk.DISABLED)
+        self.cancel_button.grid(row=10, column=1, pady=5, sticky=(tk.W, tk.E))
+        
+        self.sim_status = ttk.Label(control_frame, text="Idle")
+        self.sim_status.grid(row=11, column=0, columnspan=3, sticky=tk.W, pady=5)
         
     def create_visualization_panel(self, parent):
         viz_frame = ttk.LabelFrame(parent, text="Memory Visualization", padding="10")
@@ -165,6 +220,8 @@ class MemFlow:
             ("Page Fault Rate:", "pf_rate"),
             ("TLB Size:", "tlb_size"),
             ("Pages in Memory:", "pages_in_mem"),
+            ("Page Evictions:", "evictions"),
+            ("EMAT (cycles):", "emat"),
         ]
         
         for idx, (label, key) in enumerate(stats):
@@ -176,6 +233,11 @@ class MemFlow:
         # Export button
         ttk.Button(stats_frame, text="Export Statistics", command=self.export_stats).grid(row=len(stats), column=0, columnspan=2, pady=20, sticky=(tk.W, tk.E))
         
+        # LRU miss-ratio curve (hit rate for every TLB size, from stack distances)
+        ttk.Label(stats_frame, text="LRU Hit Rate vs TLB Size", font=('Arial', 10, 'bold')).grid(row=len(stats) + 1, column=0, columnspan=2, pady=5)
+        self.mrc_canvas = tk.Canvas(stats_frame, width=MRC_WIDTH, height=MRC_HEIGHT, bg='#2d2d2d', highlightthickness=0)
+        self.mrc_canvas.grid(row=len(stats) + 2, column=0, columnspan=2, pady=5)
+        
         self.update_statistics()
         
     def create_history_panel(self, parent):
@@ -185,93 +247,47 @@ class MemFlow:
         self.history_text = scrolledtext.ScrolledText(history_frame, width=140, height=10, bg='#2d2d2d', fg='#ffffff', font=('Courier', 9))
         self.history_text.pack(fill=tk.BOTH, expand=True)
         
-        header = f"{'Time':<20} {'Virtual Addr':<15} {'Page':<10} {'Offset':<10} {'Physical Addr':<15} {'Frame':<10} {'TLB':<10} {'Status':<15}\n"
-        header += "-" * 140 + "\n"
-        self.history_text.insert(tk.END, header)
+        self.render_history()
         
     def translate_address(self, virtual_address):
-        """Core translation logic"""
-        self.total_accesses += 1
-        
-        # Extract page number and offset
-        page_number = virtual_address >> 12  # Upper 20 bits
-        offset = virtual_address & 0xFFF     # Lower 12 bits (4096)
-        
-        tlb_hit = False
-        page_fault = False
-        frame_number = None
-        
-        # Check TLB first
-        if page_number in self.tlb:
-            frame_number = self.tlb[page_number]
-            self.tlb_hits += 1
-            tlb_hit = True
-            
-            # LRU: move to end
-            if self.tlb_policy == "LRU":
-                self.tlb.move_to_end(page_number)
-        else:
-            self.tlb_misses += 1
-            
-            # Check page table
-            if page_number in self.page_table:
-                frame_number = self.page_table[page_number]
-            else:
-                # Page fault - allocate new frame
-                page_fault = True
-                self.page_faults += 1
-                
-                if self.free_frames:
-                    frame_number = self.free_frames.pop(0)
-                else:
-                    # Simple replacement: use frame 0 (in real system, use page replacement algorithm)
-                    frame_number = 0
-                
-                self.page_table[page_number] = frame_number
-                self.physical_memory[frame_number] = page_number
-            
-            # Update TLB
-            if len(self.tlb) >= self.TLB_SIZE:
-                self.tlb.popitem(last=False)  # Remove oldest (FIFO) or LRU
-            self.tlb[page_number] = frame_number
-        
-        # Calculate physical address
-        physical_address = (frame_number << 12) | offset
-        
-        # Record history
-        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        status = "PAGE FAULT" if page_fault else ("TLB HIT" if tlb_hit else "TLB MISS")
-        
-        history_entry = {
-            'time': timestamp,
-            'virtual': virtual_address,
-            'page': page_number,
-            'offset': offset,
-            'physical': physical_address,
-            'frame': frame_number,
-            'tlb': 'HIT' if tlb_hit else 'MISS',
-            'status': status
-        }
-        
-        self.access_history.append(history_entry)
-        
-        # Display in history
-        line = f"{timestamp:<20} {virtual_address:<15} {page_number:<10} {offset:<10} {physical_address:<15} {frame_number:<10} {'HIT' if tlb_hit else 'MISS':<10} {status:<15}\n"
-        self.history_text.insert(tk.END, line)
+        """Translate one address and refresh the view"""
+        return self.translate_batch((virtual_address,))[-1].physical
+    
+    def translate_batch(self, addresses):
+        """Run addresses through the core, then refresh the view once"""
+        with self.lock:
+            results = self.core.translate_many(addresses, collect=True)
+            self.access_history.extend(time.time(), results)
+            self.analyzer.feed(addresses, self.core.PAGE_SHIFT)
+        if results:
+            self.refresh(results[-1])
+        return results
+    
+    def refresh(self, last):
+        """Redraw every panel from a consistent snapshot of the core"""
+        with self.lock:
+            self.display_translation(last.virtual, last.page, last.offset, last.physical, last.frame, last.tlb_hit, last.page_fault)
+            self.update_visualization()
+            self.update_statistics()
+            self.render_history()
+    
+    def render_history(self):
+        """Redraw the history panel with only the newest rows"""
+        lines = [HISTORY_HEADER]
+        for timestamp, result in self.access_history.tail(HISTORY_VIEW_ROWS):
+            tlb = 'HIT' if result.tlb_hit else 'MISS'
+            lines.append(f"{format_time(timestamp):<20} {result.virtual:<15} {result.page:<10} {result.offset:<10} {result.physical:<15} {result.frame:<10} {tlb:<10} {result.status:<15}\n")
+        
+        self.history_text.delete(1.0, tk.END)
+        self.history_text.insert(tk.END, "".join(lines))
         self.history_text.see(tk.END)
-        
-        # Update displays
-        self.display_translation(virtual_address, page_number, offset, physical_address, frame_number, tlb_hit, page_fault)
-        self.update_visualization()
-        self.update_statistics()
-        
-        return physical_address
     
     def display_translation(self, virtual, page, offset, physical, frame, tlb_hit, page_fault):
         """Display current translation details"""
         self.translation_text.delete(1.0, tk.END)
         
-        output = f"Virtual Address:  {virtual} (0x{virtual:08X})\n"
+        digits = (self.core.ADDRESS_BITS + 3) // 4
+        output = f"Virtual Address:  {virtual} (0x{virtual:0{digits}X})\n"
         output += f"  Page Number:    {page}\n"
         output += f"  Offset:         {offset}\n"
         output += f"\n"
@@ -285,47 +301,85 @@ class MemFlow:
     
     def update_visualization(self):
         """Update TLB and Page Table displays"""
+        core = self.core
         # TLB
         self.tlb_text.delete(1.0, tk.END)
-        self.tlb_text.insert(tk.END, f"TLB Entries ({len(self.tlb)}/{self.TLB_SIZE}) - Policy: {self.tlb_policy}\n")
+        self.tlb_text.insert(tk.END, f"TLB Entries ({len(core.tlb)}/{core.TLB_SIZE}) - Policy: {core.tlb_policy}\n")
         self.tlb_text.insert(tk.END, "-" * 40 + "\n")
         self.tlb_text.insert(tk.END, f"{'Page':<15} {'Frame':<15}\n")
         self.tlb_text.insert(tk.END, "-" * 40 + "\n")
         
-        for page, frame in self.tlb.items():
+        for page, frame in core.tlb.items():
             self.tlb_text.insert(tk.END, f"{page:<15} {frame:<15}\n")
         
         # Page Table (show last 20 entries)
         self.pt_text.delete(1.0, tk.END)
-        self.pt_text.insert(tk.END, f"Page Table Entries ({len(self.page_table)} total)\n")
+        self.pt_text.insert(tk.END, f"Page Table Entries ({len(core.page_table)} total)\n")
         self.pt_text.insert(tk.END, "-" * 40 + "\n")
-        self.pt_text.insert(tk.END, f"{'Page':<15} {'Frame':<15}\n")
+        self.pt_text.insert(tk.END, f"{'Page':<15} {'Frame':<15} {'Flags':<5}\n")
         self.pt_text.insert(tk.END, "-" * 40 + "\n")
         
-        recent_entries = list(self.page_table.items())[-20:]
-        for page, frame in recent_entries:
-            self.pt_text.insert(tk.END, f"{page:<15} {frame:<15}\n")
+        recent_entries = list(core.page_table.items())[-20:]
+        for page, entry in recent_entries:
+            self.pt_text.insert(tk.END, f"{page:<15} {pte_frame(entry):<15} {pte_flags(entry):<5}\n")
     
     def update_statistics(self):
         """Update statistics display"""
-        hit_rate = (self.tlb_hits / self.total_accesses * 100) if self.total_accesses > 0 else 0
-        pf_rate = (self.page_faults / self.total_accesses * 100) if self.total_accesses > 0 else 0
-        
-        self.stats_labels['total'].config(text=str(self.total_accesses))
-        self.stats_labels['tlb_hits'].config(text=str(self.tlb_hits))
-        self.stats_labels['tlb_misses'].config(text=str(self.tlb_misses))
-        self.stats_labels['hit_rate'].config(text=f"{hit_rate:.2f}%")
-        self.stats_labels['page_faults'].config(text=str(self.page_faults))
-        self.stats_labels['pf_rate'].config(text=f"{pf_rate:.2f}%")
-        self.stats_labels['tlb_size'].config(text=f"{len(self.tlb)}/{self.TLB_SIZE}")
-        self.stats_labels['pages_in_mem'].config(text=str(len(self.page_table)))
+        stats = self.core.stats()
+        
+        self.stats_labels['total'].config(text=str(stats['total_accesses']))
+        self.stats_labels['tlb_hits'].config(text=str(stats['tlb_hits']))
+        self.stats_labels['tlb_misses'].config(text=str(stats['tlb_misses']))
+        self.stats_labels['hit_rate'].config(text=f"{stats['tlb_hit_rate']:.2f}%")
+        self.stats_labels['page_faults'].config(text=str(stats['page_faults']))
+        self.stats_labels['pf_rate'].config(text=f"{stats['page_fault_rate']:.2f}%")
+        self.stats_labels['tlb_size'].config(text=f"{stats['tlb_entries']}/{stats['tlb_size']}")
+        self.stats_labels['pages_in_mem'].config(text=str(stats['pages_in_memory']))
+        self.stats_labels['evictions'].config(text=str(stats['evictions']))
+        self.stats_labels['emat'].config(text=f"{stats['emat']:.2f}")
+        self.plot_miss_ratio_curve()
+    
+    def plot_miss_ratio_curve(self):
+        """Draw LRU hit rate against TLB size (log scale) from the stack-distance histogram"""
+        canvas = self.mrc_canvas
+        canvas.delete("all")
+        left, right, top, bottom = 30, MRC_WIDTH - 10, 10, MRC_HEIGHT - 20
+        
+        canvas.create_line(left, bottom, right, bottom, fill='#888888')
+        canvas.create_line(left, top, left, bottom, fill='#888888')
+        canvas.create_text(left - 4, top, text="100%", anchor=tk.E, fill='#888888', font=('Arial', 7))
+        canvas.create_text(left - 4, bottom, text="0%", anchor=tk.E, fill='#888888', font=('Arial', 7))
+        
+        sizes = [2**i for i in range(MRC_MAX_LOG2 + 1)]
+        def x_of(index):
+            return left + (right - left) * index / MRC_MAX_LOG2
+        def y_of(rate):
+            return bottom - (bottom - top) * rate / 100
+        for index in range(0, MRC_MAX_LOG2 + 1, 2):
+            canvas.create_text(x_of(index), bottom + 10, text=str(sizes[index]), fill='#888888', font=('Arial', 7))
+        
+        curve = self.analyzer.curve()
+        if curve.total == 0:
+            return
+        coords = []
+        for index, (size, hits, hit_rate, miss_rate) in enumerate(curve.points(sizes)):
+            coords += [x_of(index), y_of(hit_rate)]
+        canvas.create_line(*coords, fill='#4CAF50', width=2)
+        
+        # Mark the configured TLB size
+        tlb_size = self.core.TLB_SIZE
+        index = min(tlb_size.bit_length() - 1, MRC_MAX_LOG2)
+        x, y = x_of(index), y_of(curve.hit_rate(tlb_size))
+        canvas.create_oval(x - 3, y - 3, x + 3, y + 3, fill='#ffffff', outline='')
     
     def translate_single(self):
         """Translate single address from entry"""
+        if self.simulation_running():
+            return
         try:
             addr = int(self.address_entry.get())
-            if addr < 0 or addr >= self.VIRTUAL_MEMORY_SIZE:
-                messagebox.showerror("Error", f"Address must be between 0 and {self.VIRTUAL_MEMORY_SIZE-1}")
+            if addr < 0 or addr >= self.core.VIRTUAL_MEMORY_SIZE:
+                messagebox.showerror("Error", f"Address must be between 0 and {self.core.VIRTUAL_MEMORY_SIZE-1}")
                 return
             self.translate_address(addr)
         except ValueError:
@@ -333,116 +387,203 @@ class MemFlow:
     
     def translate_single_hex(self):
         """Translate single hex address"""
+        if self.simulation_running():
+            return
         try:
             addr = int(self.hex_entry.get(), 16)
-            if addr < 0 or addr >= self.VIRTUAL_MEMORY_SIZE:
-                messagebox.showerror("Error", f"Address must be between 0 and 0x{self.VIRTUAL_MEMORY_SIZE-1:X}")
+            if addr < 0 or addr >= self.core.VIRTUAL_MEMORY_SIZE:
+                messagebox.showerror("Error", f"Address must be between 0 and 0x{self.core.VIRTUAL_MEMORY_SIZE-1:X}")
                 return
             self.translate_address(addr)
         except ValueError:
             messagebox.showerror("Error", "Please enter a valid hexadecimal number (e.g., 1A2B3C)")
     
     def generate_random(self):
-        """Generate and translate random addresses"""
+        """Generate and translate addresses from the selected synthetic pattern"""
         try:
             count = int(self.random_count.get())
-            if count <= 0 or count > 10000:
-                messagebox.showerror("Error", "Count must be between 1 and 10000")
+            if count <= 0 or count > MAX_RANDOM_COUNT:
+                messagebox.showerror("Error", f"Count must be between 1 and {MAX_RANDOM_COUNT}")
                 return
-            
-            for _ in range(count):
-                addr = random.randint(0, self.VIRTUAL_MEMORY_SIZE - 1)
-                self.translate_address(addr)
-                if self.step_mode.get():
-                    self.root.update()
-                    self.root.after(100)
-                    
         except ValueError:
             messagebox.showerror("Error", "Please enter a valid number")
+            return
+        
+        if not HAVE_NUMPY:
+            limit = self.core.VIRTUAL_MEMORY_SIZE - 1
+            self.start_simulation((random.randint(0, limit) for _ in range(count)), total=count)
+            return
+        try:
+            workload = make_workload(self.pattern_var.get(), count, address_bits=self.core.ADDRESS_BITS,
+                                     page_size=self.core.PAGE_SIZE)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        addresses = chain.from_iterable(chunk.tolist() for chunk, _, _ in workload.chunks(WORKER_CHUNK))
+        self.start_simulation(addresses, total=count)
     
     def load_file(self):
         """Load addresses from file"""
-        filename = filedialog.askopenfilename(title="Select Address File", filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")])
+        if self.simulation_running():
+            return
+        filename = filedialog.askopenfilename(title="Select Address File", filetypes=[("Text Files", "*.txt"), ("Binary Traces", "*.mft"), ("All Files", "*.*")])
         if filename:
+            addresses = read_addresses(filename, max_address=self.core.VIRTUAL_MEMORY_SIZE - 1)
+            self.start_simulation(addresses, done_message="File loaded successfully")
+    
+    def simulation_running(self):
+        """True (after telling the user) if a background simulation is active"""
+        if self.worker is not None:
+            messagebox.showerror("Error", "A simulation is already running; cancel it first")
+            return True
+        return False
+    
+    def start_simulation(self, addresses, total=None, done_message=None):
+        """Translate addresses on a worker thread, refreshing panels every FRAME_MS"""
+        if self.simulation_running():
+            return
+        step = self.step_mode.get()
+        self.worker = SimulationWorker(self.core, self.access_history, self.lock, addresses, self.events,
+                                       chunk_size=1 if step else WORKER_CHUNK,
+                                       step_delay=STEP_DELAY if step else 0, analyzer=self.analyzer)
+        self.worker_total = total
+        self.worker_done_message = done_message
+        self.pause_button.config(text="Pause", state=tk.NORMAL)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.sim_status.config(text="Running...")
+        self.worker.start()
+        self.root.after(FRAME_MS, self.poll_worker)
+    
+    def poll_worker(self):
+        """Drain worker messages and coalesce them into a single refresh"""
+        latest = None
+        finished = None
+        while True:
             try:
-                with open(filename, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#'):
-                            try:
-                                addr = int(line)
-                                self.translate_address(addr)
-                                if self.step_mode.get():
-                                    self.root.update()
-                                    self.root.after(100)
-                            except ValueError:
-                                continue
-                messagebox.showinfo("Success", f"File loaded successfully")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load file: {str(e)}")
+                message = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == 'progress':
+                latest = message
+            else:
+                finished = message
+        
+        if latest is not None:
+            _, processed, last_result = latest
+            self.refresh(last_result)
+            progress = f"{processed:,}" if self.worker_total is None else f"{processed:,} / {self.worker_total:,}"
+            self.sim_status.config(text=f"{'Paused' if self.worker.paused else 'Running'}: {progress} accesses")
+        
+        if finished is None:
+            self.root.after(FRAME_MS, self.poll_worker)
+            return
+        
+        # The run stays active until its done message is handled here, so a new
+        # run cannot start while this poll loop is still pending
+        _, processed, cancelled, error = finished
+        self.worker = None
+        self.pause_button.config(text="Pause", state=tk.DISABLED)
+        self.cancel_button.config(state=tk.DISABLED)
+        self.sim_status.config(text=f"{'Cancelled' if cancelled else 'Finished'}: {processed:,} accesses")
+        if error is not None:
+            messagebox.showerror("Error", f"Simulation failed: {str(error)}")
+        elif not cancelled and self.worker_done_message:
+            messagebox.showinfo("Success", self.worker_done_message)
+    
+    def toggle_pause(self):
+        """Pause or resume the running simulation"""
+        if self.worker is None or not self.worker.is_alive():
+            return
+        if self.worker.paused:
+            self.worker.resume()
+            self.pause_button.config(text="Pause")
+            self.sim_status.config(text="Running...")
+        else:
+            self.worker.pause()
+            self.pause_button.config(text="Resume")
+            self.sim_status.config(text="Paused")
+    
+    def cancel_simulation(self):
+        """Stop the running simulation after its current chunk"""
+        if self.worker is not None and self.worker.is_alive():
+            self.worker.cancel()
     
     def change_policy(self, event):
         """Change TLB replacement policy"""
-        self.tlb_policy = self.policy_var.get()
-        self.update_visualization()
+        with self.lock:
+            self.core.tlb_policy = self.policy_var.get()
+            self.update_visualization()
+    
+    def change_replacement(self, event):
+        """Change page replacement policy"""
+        with self.lock:
+            self.core.set_replacement(self.replacement_var.get())
+            self.update_statistics()
+    
+    def change_memory_config(self, event):
+        """Rebuild the core for a new page size / address width"""
+        page_size = {label: size for size, label in PAGE_SIZE_LABELS.items()}[self.page_size_var.get()]
+        address_bits = int(self.address_bits_var.get().split("-")[0])
+        if page_size == self.core.PAGE_SIZE and address_bits == self.core.ADDRESS_BITS:
+            return
+        if self.simulation_running() or (self.core.total_accesses and not messagebox.askyesno(
+                "Confirm Reset", "Changing the memory configuration resets all data. Continue?")):
+            self.page_size_var.set(PAGE_SIZE_LABELS[self.core.PAGE_SIZE])
+            self.address_bits_var.set(f"{self.core.ADDRESS_BITS}-bit")
+            return
+        
+        with self.lock:
+            self.core = MemFlowCore(tlb_policy=self.policy_var.get(), page_size=page_size, address_bits=address_bits,
+                                    replacement=self.replacement_var.get())
+        self.clear_view()
     
     def reset_all(self):
         """Reset all data structures and statistics"""
+        if self.simulation_running():
+            return
         if messagebox.askyesno("Confirm Reset", "Are you sure you want to reset all data?"):
-            self.page_table.clear()
-            self.tlb.clear()
-            self.physical_memory = [None] * self.NUM_FRAMES
-            self.free_frames = list(range(self.NUM_FRAMES))
-            
-            self.total_accesses = 0
-            self.tlb_hits = 0
-            self.tlb_misses = 0
-            self.page_faults = 0
-            self.access_history.clear()
-            
-            self.history_text.delete(1.0, tk.END)
-            header = f"{'Time':<20} {'Virtual Addr':<15} {'Page':<10} {'Offset':<10} {'Physical Addr':<15} {'Frame':<10} {'TLB':<10} {'Status':<15}\n"
-            header += "-" * 140 + "\n"
-            self.history_text.insert(tk.END, header)
-            
-            self.translation_text.delete(1.0, tk.END)
-            
-            self.update_visualization()
-            self.update_statistics()
+            self.core.reset()
+            self.clear_view()
+    
+    def clear_view(self):
+        """Drop history and analysis, then redraw the empty panels"""
+        self.access_history.clear()
+        self.analyzer.reset()
+        self.render_history()
+        
+        self.translation_text.delete(1.0, tk.END)
+        
+        self.update_visualization()
+        self.update_statistics()
     
     def export_stats(self):
         """Export statistics to file"""
+        if self.simulation_running():
+            return
         filename = filedialog.asksaveasfilename(defaultextension=".txt", filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")])
         if filename:
             try:
                 with open(filename, 'w') as f:
                     f.write("MemFlow - Virtual Memory Manager Statistics\n")
                     f.write("=" * 50 + "\n\n")
-                    f.write(f"Total Memory Accesses: {self.total_accesses}\n")
-                    f.write(f"TLB Hits: {self.tlb_hits}\n")
-                    f.write(f"TLB Misses: {self.tlb_misses}\n")
-                    hit_rate = (self.tlb_hits / self.total_accesses * 100) if self.total_accesses > 0 else 0
-                    f.write(f"TLB Hit Rate: {hit_rate:.2f}%\n")
-                    f.write(f"Page Faults: {self.page_faults}\n")
-                    pf_rate = (self.page_faults / self.total_accesses * 100) if self.total_accesses > 0 else 0
-                    f.write(f"Page Fault Rate: {pf_rate:.2f}%\n")
-                    f.write(f"TLB Size: {len(self.tlb)}/{self.TLB_SIZE}\n")
-                    f.write(f"Pages in Memory: {len(self.page_table)}\n")
-                    f.write(f"TLB Replacement Policy: {self.tlb_policy}\n\n")
+                    for line in format_stats(self.core.stats()):
+                        f.write(line + "\n")
+                    f.write("\n")
                     
                     f.write("Access History:\n")
                     f.write("-" * 100 + "\n")
-                    for entry in self.access_history:
-                        f.write(f"{entry['time']} | Virtual: {entry['virtual']} | Page: {entry['page']} | Frame: {entry['frame']} | {entry['status']}\n")
+                    for timestamp, result in self.access_history:
+                        f.write(f"{format_time(timestamp)} | Virtual: {result.virtual} | Page: {result.page} | Frame: {result.frame} | {result.status}\n")
                 
                 messagebox.showinfo("Success", "Statistics exported successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to export: {str(e)}")
 
-def main():
+def main(history_capacity=10000, history_spill=None):
     root = tk.Tk()
-    app = MemFlow(root)
+    app = MemFlow(root, history_capacity, history_spill)
     root.mainloop()
+    app.access_history.close()
 
 if __name__ == "__main__":
     main()
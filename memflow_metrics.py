@@ -0,0 +1,374 @@
+"""
+MemFlow: Virtual Memory Manager with TLB Simulation
+Live Metrics and Profiling Hooks
+
+Instrumentation wraps a MemFlowCore and is called in its place. It cuts the
+input at every `window` accesses and reads the core's counters there, so the
+time series costs one extra call per window rather than per access. Per-access
+TLB hit/miss callbacks switch to the collecting path, and page fault/eviction
+callbacks hook the core's fault path; both only when someone registers them.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import socket
+import sys
+import time
+
+from memflow_core import FETCH, READ
+
+EVENTS = ("tlb_hit", "tlb_miss", "page_fault", "eviction", "window", "fault_burst")
+METRIC_FORMATS = ("jsonl", "prometheus")
+
+
+class Instrumentation:
+    """Event callbacks, windowed time series and export over a MemFlowCore
+
+    Callbacks, registered with on(event, callback), receive:
+
+        tlb_hit / tlb_miss  (result, pid)              result is an AccessResult
+        page_fault          (pid, page, frame)
+        eviction            (pid, page, frame, dirty)  pid owned the evicted page
+        window              (record)                   see _close_window
+        fault_burst         (record)                   consecutive windows whose
+                                                       fault rate >= burst_threshold
+
+    translate_many/translate_array take sequences (anything len() and slices
+    work on), not one-shot iterators.
+    """
+
+    def __init__(self, core, window=100_000, burst_threshold=0.05, exporter=None, profile=False):
+        if window < 0:
+            raise ValueError("Metrics window must not be negative")
+        if not 0 < burst_threshold <= 1:
+            raise ValueError("Fault burst threshold must be between 0 and 1")
+        self.core = core
+        self.window = window  # 0: no windows, only the final snapshot
+        self.burst_threshold = burst_threshold
+        self.exporter = exporter
+        self.listeners = {event: [] for event in EVENTS}
+        self.profiler = cProfile.Profile() if profile else None
+        self.seconds = 0.0  # wall time spent inside the core
+        self.windows = 0
+        self.bursts = []
+        self._burst = None
+        self._filled = 0
+        self._mark = self._counters()
+
+    def on(self, event, callback):
+        """Call callback(...) on every event of the given kind"""
+        if event not in EVENTS:
+            raise ValueError(f"Unknown event: {event}")
+        self.listeners[event].append(callback)
+        if event in ("page_fault", "eviction"):
+            self.core.observer = self
+
+    # Called by the core's fault path while it is observed
+
+    def page_fault(self, pid, page, frame):
+        for callback in self.listeners['page_fault']:
+            callback(pid, page, frame)
+
+    def evicted(self, pid, page, frame, dirty):
+        for callback in self.listeners['eviction']:
+            callback(pid, page, frame, dirty)
+
+    def translate_many(self, addresses, collect=False, kinds=None):
+        """core.translate_many, fed window by window"""
+        results = [] if collect else None
+        self._feed(addresses, kinds, collect, False, results)
+        return results
+
+    def translate_array(self, addresses, kinds=None):
+        """core.translate_array, fed window by window"""
+        self._feed(addresses, kinds, False, True, None)
+
+    def _feed(self, addresses, kinds, collect, bulk, results):
+        per_access = bool(self.listeners['tlb_hit'] or self.listeners['tlb_miss'])
+        total = len(addresses)
+        start = 0
+        while start < total:
+            end = total if not self.window else min(total, start + self.window - self._filled)
+            if start == 0 and end == total:
+                piece, piece_kinds = addresses, kinds
+            else:
+                piece = addresses[start:end]
+                piece_kinds = kinds[start:end] if kinds is not None else None
+            self._translate(piece, piece_kinds, collect, bulk, per_access, results)
+            self._filled += end - start
+            start = end
+            if self._filled == self.window:
+                self._close_window()
+
+    def _translate(self, addresses, kinds, collect, bulk, per_access, results):
+        core = self.core
+        profiler = self.profiler
+        began = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            if per_access or collect:
+                if bulk and kinds is not None:
+                    # translate_array sends fetches through the data TLB too
+                    kinds = "".join(kinds).replace(FETCH, READ)
+                piece = core.translate_many(addresses, collect=True, kinds=kinds)
+            elif bulk:
+                core.translate_array(addresses, kinds)
+                piece = None
+            else:
+                core.translate_many(addresses, kinds=kinds)
+                piece = None
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            self.seconds += time.perf_counter() - began
+        if piece is None:
+            return
+        if per_access:
+            on_hit, on_miss, pid = self.listeners['tlb_hit'], self.listeners['tlb_miss'], core.pid
+            for result in piece:
+                for callback in (on_hit if result.tlb_hit else on_miss):
+                    callback(result, pid)
+        if collect:
+            results.extend(piece)
+
+    def _counters(self):
+        core = self.core
+        return (core.total_accesses, core.tlb_hits, core.page_faults, core.evictions,
+                core.page_outs, core.writes, core.cycles(), self.seconds)
+
+    def _close_window(self):
+        """Record the accesses since the last window and publish them
+
+        A record holds the window's index, first access, access count, TLB
+        hits/misses and hit rate, page faults and fault rate, evictions,
+        page-outs, writes, cycles, EMAT, and the wall time spent simulating.
+        """
+        now = self._counters()
+        accesses, hits, faults, evictions, page_outs, writes, cycles, seconds = (
+            after - before for after, before in zip(now, self._mark))
+        self._filled = 0
+        if not accesses:
+            return
+        record = {
+            'window': self.windows,
+            'start': self._mark[0],
+            'accesses': accesses,
+            'tlb_hits': hits,
+            'tlb_misses': accesses - hits,
+            'tlb_hit_rate': hits / accesses * 100,
+            'page_faults': faults,
+            'page_fault_rate': faults / accesses * 100,
+            'evictions': evictions,
+            'page_outs': page_outs,
+            'writes': writes,
+            'cycles': cycles,
+            'emat': cycles / accesses,
+            'seconds': seconds,
+            'accesses_per_sec': accesses / seconds if seconds else None,
+        }
+        self._mark = now
+        self.windows += 1
+        self._track_burst(record)
+        for callback in self.listeners['window']:
+            callback(record)
+        if self.exporter is not None:
+            self.exporter.window(record, self)
+
+    def _track_burst(self, record):
+        burst = self._burst
+        if record['page_faults'] >= record['accesses'] * self.burst_threshold:
+            if burst is None:
+                burst = self._burst = {'start': record['start'], 'end': 0, 'windows': 0,
+                                       'page_faults': 0, 'peak_fault_rate': 0.0}
+            burst['end'] = record['start'] + record['accesses']
+            burst['windows'] += 1
+            burst['page_faults'] += record['page_faults']
+            burst['peak_fault_rate'] = max(burst['peak_fault_rate'], record['page_fault_rate'])
+        elif burst is not None:
+            self._end_burst()
+
+    def _end_burst(self):
+        burst, self._burst = self._burst, None
+        self.bursts.append(burst)
+        for callback in self.listeners['fault_burst']:
+            callback(burst)
+        if self.exporter is not None:
+            self.exporter.event('fault_burst', burst)
+
+    def close(self):
+        """Close the partial window and any open burst, then publish the final snapshot"""
+        if self._filled:
+            self._close_window()
+        if self._burst is not None:
+            self._end_burst()
+        if self.core.observer is self:
+            self.core.observer = None
+        if self.exporter is not None:
+            self.exporter.close(self)
+
+    def profile_report(self, limit=20):
+        """Top functions by cumulative time inside the core, as text"""
+        if self.profiler is None:
+            return ""
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+
+def open_metrics_target(target):
+    """Open a text stream to "-" (stdout), tcp://HOST:PORT, unix://PATH or a file path"""
+    if target == "-":
+        return sys.stdout
+    if target.startswith("tcp://"):
+        host, _, port = target[len("tcp://"):].rpartition(":")
+        if not host or not port.isdigit():
+            raise ValueError(f"Metrics target must be tcp://HOST:PORT, not {target}")
+        return socket.create_connection((host, int(port))).makefile('w', encoding='utf-8')
+    if target.startswith("unix://"):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(target[len("unix://"):])
+        return sock.makefile('w', encoding='utf-8')
+    return open(target, 'w', encoding='utf-8')
+
+
+def _is_stream_target(target):
+    return target == "-" or target.startswith(("tcp://", "unix://"))
+
+
+class JSONLinesExporter:
+    """One JSON object per line: every window, every fault burst, then a summary"""
+
+    def __init__(self, target):
+        self.stream = open_metrics_target(target)
+
+    def _write(self, kind, record):
+        self.stream.write(json.dumps({'type': kind, **record}) + "\n")
+        self.stream.flush()
+
+    def window(self, record, instrumentation):
+        self._write('window', record)
+
+    def event(self, kind, record):
+        self._write(kind, record)
+
+    def close(self, instrumentation):
+        stats = instrumentation.core.stats()
+        stats['simulator_seconds'] = instrumentation.seconds
+        stats['windows'] = instrumentation.windows
+        stats['fault_bursts'] = len(instrumentation.bursts)
+        self._write('summary', stats)
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+class PrometheusExporter:
+    """Prometheus text exposition, republished after every window
+
+    A file target is replaced atomically each time (as node_exporter's
+    textfile collector expects); a stream target receives each snapshot in
+    turn, separated by a blank line.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.stream = open_metrics_target(target) if _is_stream_target(target) else None
+        self.last_window = None
+
+    def window(self, record, instrumentation):
+        self.last_window = record
+        self._publish(instrumentation)
+
+    def event(self, kind, record):
+        pass  # bursts are exposed as a counter in the next snapshot
+
+    def close(self, instrumentation):
+        self._publish(instrumentation)
+        if self.stream is not None and self.stream is not sys.stdout:
+            self.stream.close()
+
+    def _publish(self, instrumentation):
+        text = format_prometheus(instrumentation.core.stats(), instrumentation, self.last_window)
+        if self.stream is not None:
+            self.stream.write(text + "\n")
+            self.stream.flush()
+            return
+        partial = self.target + ".tmp"
+        with open(partial, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(partial, self.target)
+
+
+# (stats key, metric name, type, help) exported from every snapshot
+PROMETHEUS_METRICS = (
+    ('total_accesses', 'memflow_accesses_total', 'counter', 'Address translations performed'),
+    ('tlb_hits', 'memflow_tlb_hits_total', 'counter', 'Translations found in the TLB'),
+    ('tlb_misses', 'memflow_tlb_misses_total', 'counter', 'Translations that needed a page walk'),
+    ('page_faults', 'memflow_page_faults_total', 'counter', 'Page faults (each one a page-in)'),
+    ('evictions', 'memflow_evictions_total', 'counter', 'Resident pages evicted'),
+    ('page_outs', 'memflow_page_outs_total', 'counter', 'Dirty pages written to the backing store'),
+    ('writes', 'memflow_writes_total', 'counter', 'Write accesses'),
+    ('context_switches', 'memflow_context_switches_total', 'counter', 'Context switches'),
+    ('total_cycles', 'memflow_cycles_total', 'counter', 'Simulated cycles'),
+    ('pages_in_memory', 'memflow_pages_in_memory', 'gauge', 'Resident pages'),
+    ('dirty_pages', 'memflow_dirty_pages', 'gauge', 'Resident pages with the dirty bit set'),
+    ('emat', 'memflow_emat_cycles', 'gauge', 'Effective memory access time so far'),
+)
+# (window record key, metric name, help); rates are exported as 0-1 ratios
+PROMETHEUS_WINDOW_METRICS = (
+    ('tlb_hit_rate', 'memflow_window_tlb_hit_ratio', 'TLB hit ratio over the last window'),
+    ('page_fault_rate', 'memflow_window_page_fault_ratio', 'Page fault ratio over the last window'),
+    ('emat', 'memflow_window_emat_cycles', 'Effective memory access time over the last window'),
+    ('accesses_per_sec', 'memflow_window_accesses_per_second', 'Simulator throughput over the last window'),
+)
+
+
+def format_prometheus(stats, instrumentation=None, window=None):
+    """Render a stats() dict (and the latest window) in Prometheus text format"""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{labels} {value}")
+
+    for key, name, kind, help_text in PROMETHEUS_METRICS:
+        metric(name, kind, help_text, [("", stats[key])])
+    if stats['tlb_levels']:
+        metric('memflow_tlb_level_hits_total', 'counter', 'Hits per TLB level',
+               [(f'{{level="{level["name"]}"}}', level['hits']) for level in stats['tlb_levels']])
+        metric('memflow_tlb_level_misses_total', 'counter', 'Misses per TLB level',
+               [(f'{{level="{level["name"]}"}}', level['misses']) for level in stats['tlb_levels']])
+    if len(stats['processes']) > 1:
+        for key, name, help_text in (('total_accesses', 'memflow_process_accesses_total', 'Accesses per process'),
+                                     ('page_faults', 'memflow_process_page_faults_total', 'Page faults per process'),
+                                     ('evicted', 'memflow_process_evicted_total', 'Pages evicted per owning process')):
+            metric(name, 'counter', help_text,
+                   [(f'{{pid="{process["pid"]}"}}', process[key]) for process in stats['processes']])
+    if window is not None:
+        for key, name, help_text in PROMETHEUS_WINDOW_METRICS:
+            value = window[key]
+            if value is None:
+                continue
+            if key.endswith('_rate'):
+                value /= 100
+            metric(name, 'gauge', help_text, [("", float(value))])
+    if instrumentation is not None:
+        metric('memflow_fault_bursts_total', 'counter', 'Fault bursts seen',
+               [("", len(instrumentation.bursts))])
+        metric('memflow_simulator_seconds_total', 'counter', 'Wall time spent inside the simulator',
+               [("", float(instrumentation.seconds))])
+    return "\n".join(lines) + "\n"
+
+
+def make_exporter(fmt, target):
+    """Build the exporter for a METRIC_FORMATS name writing to target"""
+    if fmt == "jsonl":
+        return JSONLinesExporter(target)
+    if fmt == "prometheus":
+        return PrometheusExporter(target)
+    raise ValueError(f"Unknown metrics format: {fmt}")
@@ -0,0 +1,226 @@
+"""
+MemFlow: Virtual Memory Manager with TLB Simulation
+Page Table Layouts
+
+Every layout supports the subset of the dict interface the core uses:
+get(page) -> entry or None, table[page] = entry, pop(page), len() and items().
+The core stores packed page-table entries: the frame number above three
+status bits (see make_pte), so each entry still fits one int32 slot.
+"""
+
+import time
+import tracemalloc
+from array import array
+
+PAGE_TABLE_LAYOUTS = ("dict", "flat", "radix")
+
+# Flat tables allocate one slot per virtual page; refuse absurd sizes
+FLAT_MAX_PAGES = 2**28
+
+UNMAPPED = -1
+
+# Page-table entry status bits, below the frame number
+PTE_VALID = 1
+PTE_DIRTY = 2  # written since it was loaded; must be paged out on eviction
+PTE_REFERENCED = 4  # set when loaded or reached by a page walk
+PTE_FLAG_BITS = 3
+PTE_MAX_FRAMES = 2**(31 - PTE_FLAG_BITS)  # frames an int32 entry can address
+
+
+def make_pte(frame, flags=PTE_VALID):
+    """Pack a frame number and status bits into one page-table entry"""
+    return (frame << PTE_FLAG_BITS) | flags
+
+
+def pte_frame(entry):
+    """Frame number held in a packed page-table entry"""
+    return entry >> PTE_FLAG_BITS
+
+
+def pte_flags(entry):
+    """Status bits of an entry as text: "VDR" with "-" for each clear bit"""
+    return "".join(flag if entry & bit else "-" for flag, bit in
+                   (("V", PTE_VALID), ("D", PTE_DIRTY), ("R", PTE_REFERENCED)))
+
+
+class DictPageTable(dict):
+    """Hash map of resident pages only; fastest lookups, most bytes per entry"""
+    layout = "dict"
+
+    def __init__(self, num_pages=None):
+        super().__init__()
+
+
+class FlatPageTable:
+    """One int32 slot per virtual page, indexed directly by page number"""
+    __slots__ = ('entries', 'count')
+    layout = "flat"
+
+    def __init__(self, num_pages):
+        if num_pages > FLAT_MAX_PAGES:
+            raise ValueError(f"Flat page table would need {num_pages} entries; use the radix layout")
+        self.entries = array('i', [UNMAPPED]) * num_pages
+        self.count = 0
+
+    def get(self, page, default=None):
+        entry = self.entries[page]
+        return default if entry == UNMAPPED else entry
+
+    def __setitem__(self, page, entry):
+        if self.entries[page] == UNMAPPED:
+            self.count += 1
+        self.entries[page] = entry
+
+    def __contains__(self, page):
+        return self.entries[page] != UNMAPPED
+
+    def pop(self, page):
+        entry = self.entries[page]
+        if entry == UNMAPPED:
+            raise KeyError(page)
+        self.entries[page] = UNMAPPED
+        self.count -= 1
+        return entry
+
+    def __len__(self):
+        return self.count
+
+    def items(self):
+        return ((page, entry) for page, entry in enumerate(self.entries) if entry != UNMAPPED)
+
+
+class RadixPageTable:
+    """Sparse multi-level table, split like a hardware page walk
+
+    The page number is cut into level_bits-wide indices (10/10 for the default
+    20-bit page number, like 32-bit x86). Inner levels are Python lists that
+    are only allocated when something below them is mapped; leaves are int32
+    arrays.
+    """
+    __slots__ = ('root', 'count', 'shifts', 'fanouts', 'leaf_mask')
+    layout = "radix"
+
+    def __init__(self, num_pages, level_bits=10):
+        page_bits = max((num_pages - 1).bit_length(), 1)
+        widths = []
+        remaining = page_bits
+        while remaining > 0:
+            widths.append(min(level_bits, remaining))
+            remaining -= level_bits
+        widths.reverse()  # leftover bits go to the top level
+
+        shifts = []
+        shift = page_bits
+        for width in widths:
+            shift -= width
+            shifts.append(shift)
+        self.shifts = shifts
+        self.fanouts = [1 << width for width in widths]
+        self.leaf_mask = self.fanouts[-1] - 1
+        self.root = self._new_node(0)
+        self.count = 0
+
+    def _new_node(self, level):
+        if level == len(self.fanouts) - 1:
+            return array('i', [UNMAPPED]) * self.fanouts[level]
+        return [None] * self.fanouts[level]
+
+    def _leaf(self, page, create=False):
+        """Walk the inner levels down to the leaf array covering page"""
+        node = self.root
+        shifts = self.shifts
+        fanouts = self.fanouts
+        for level in range(len(shifts) - 1):
+            index = (page >> shifts[level]) & (fanouts[level] - 1)
+            child = node[index]
+            if child is None:
+                if not create:
+                    return None
+                child = node[index] = self._new_node(level + 1)
+            node = child
+        return node
+
+    def get(self, page, default=None):
+        # Inlined walk: this is the hot path on every TLB miss
+        node = self.root
+        fanouts = self.fanouts
+        shifts = self.shifts
+        for level in range(len(shifts) - 1):
+            node = node[(page >> shifts[level]) & (fanouts[level] - 1)]
+            if node is None:
+                return default
+        entry = node[page & self.leaf_mask]
+        return default if entry == UNMAPPED else entry
+
+    def __setitem__(self, page, entry):
+        leaf = self._leaf(page, create=True)
+        index = page & self.leaf_mask
+        if leaf[index] == UNMAPPED:
+            self.count += 1
+        leaf[index] = entry
+
+    def __contains__(self, page):
+        return self.get(page) is not None
+
+    def pop(self, page):
+        leaf = self._leaf(page)
+        index = page & self.leaf_mask
+        if leaf is None or leaf[index] == UNMAPPED:
+            raise KeyError(page)
+        entry = leaf[index]
+        leaf[index] = UNMAPPED
+        self.count -= 1
+        return entry
+
+    def __len__(self):
+        return self.count
+
+    def items(self):
+        def walk(node, level, base):
+            if isinstance(node, array):
+                for index, entry in enumerate(node):
+                    if entry != UNMAPPED:
+                        yield base | index, entry
+                return
+            for index, child in enumerate(node):
+                if child is not None:
+                    yield from walk(child, level + 1, base | (index << self.shifts[level]))
+        return walk(self.root, 0, 0)
+
+
+def make_page_table(layout, num_pages):
+    """Build an empty page table of the given layout"""
+    if layout == "dict":
+        return DictPageTable()
+    if layout == "flat":
+        return FlatPageTable(num_pages)
+    if layout == "radix":
+        return RadixPageTable(num_pages)
+    raise ValueError(f"Unknown page table layout: {layout}")
+
+
+def measure_layout(layout, pages, num_pages):
+    """Map every distinct page in `pages`, then time lookups of the whole sequence
+
+    Returns measured resident bytes (tracemalloc) and mean lookup latency.
+    """
+    tracemalloc.start()
+    try:
+        table = make_page_table(layout, num_pages)
+        for frame, page in enumerate(dict.fromkeys(pages)):
+            table[page] = make_pte(frame)
+        resident, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    get = table.get
+    start = time.perf_counter_ns()
+    for page in pages:
+        get(page)
+    elapsed = time.perf_counter_ns() - start
+    return {
+        'layout': layout,
+        'entries': len(table),
+        'resident_bytes': resident,
+        'lookup_ns': elapsed / len(pages) if pages else 0,
+    }
@@ -0,0 +1,178 @@
+"""
+MemFlow: Virtual Memory Manager with TLB Simulation
+Page Replacement Policies
+"""
+
+import heapq
+from collections import OrderedDict, deque
+
+REPLACEMENT_POLICIES = ("FIFO", "LRU", "Clock", "OPT")
+
+
+class ReplacementPolicy:
+    """Chooses which resident page to evict once every frame is in use
+
+    The core calls loaded() when a page is brought into a frame and evict()
+    when it needs a victim. Policies that depend on references set
+    tracks_access, and then also receive access() on every reference to a
+    resident page (TLB hits included); the others pay nothing per access.
+    """
+    name = None
+    tracks_access = False
+
+    def reset(self, num_frames):
+        """Forget all resident pages"""
+        raise NotImplementedError
+
+    def loaded(self, page, frame):
+        """Page was just loaded into frame"""
+        raise NotImplementedError
+
+    def access(self, page, frame):
+        """Resident page was referenced"""
+
+    def evict(self):
+        """Remove and return the page to evict"""
+        raise NotImplementedError
+
+
+class FIFOReplacement(ReplacementPolicy):
+    """Evict the page that has been resident the longest"""
+    name = "FIFO"
+
+    def reset(self, num_frames):
+        self.queue = deque()
+
+    def loaded(self, page, frame):
+        self.queue.append(page)
+
+    def evict(self):
+        return self.queue.popleft()
+
+
+class LRUReplacement(ReplacementPolicy):
+    """Evict the least recently referenced page"""
+    name = "LRU"
+    tracks_access = True
+
+    def reset(self, num_frames):
+        self.order = OrderedDict()
+
+    def loaded(self, page, frame):
+        self.order[page] = None
+
+    def access(self, page, frame):
+        self.order.move_to_end(page)
+
+    def evict(self):
+        return self.order.popitem(last=False)[0]
+
+
+class ClockReplacement(ReplacementPolicy):
+    """Second-chance: sweep frames, clearing reference bits until one is unset"""
+    name = "Clock"
+    tracks_access = True
+
+    def reset(self, num_frames):
+        self.pages = [None] * num_frames
+        self.referenced = bytearray(num_frames)
+        self.hand = 0
+
+    def loaded(self, page, frame):
+        self.pages[frame] = page
+        self.referenced[frame] = 1
+
+    def access(self, page, frame):
+        self.referenced[frame] = 1
+
+    def evict(self):
+        pages = self.pages
+        referenced = self.referenced
+        num_frames = len(pages)
+        hand = self.hand
+        while referenced[hand] or pages[hand] is None:
+            referenced[hand] = 0
+            hand = (hand + 1) % num_frames
+        victim = pages[hand]
+        pages[hand] = None
+        self.hand = (hand + 1) % num_frames
+        return victim
+
+
+class OPTReplacement(ReplacementPolicy):
+    """Belady's optimal policy: evict the page whose next use is farthest away
+
+    Needs the whole page-number sequence up front, so it only applies to
+    offline traces. Consecutive repeats of a page are collapsed, matching the
+    way the core skips same-page runs.
+    """
+    name = "OPT"
+    tracks_access = True
+
+    def __init__(self, future_pages):
+        sequence = []
+        last = None
+        for page in future_pages:
+            if page != last:
+                sequence.append(page)
+                last = page
+        self.sequence = sequence
+
+        # next_use[i]: position of the next reference to sequence[i]
+        never = len(sequence)
+        next_use = [never] * len(sequence)
+        seen = {}
+        for i in range(len(sequence) - 1, -1, -1):
+            page = sequence[i]
+            next_use[i] = seen.get(page, never)
+            seen[page] = i
+        self.next_use = next_use
+
+    def reset(self, num_frames):
+        self.position = -1
+        self.last = None
+        self.resident = {}  # {page: next use position}
+        self.heap = []
+
+    def _advance(self, page):
+        if page == self.last:
+            return
+        self.position += 1
+        self.last = page
+        position = self.position
+        if position >= len(self.sequence) or self.sequence[position] != page:
+            raise ValueError("OPT replacement: accesses do not match the trace it was built from")
+        next_use = self.next_use[position]
+        self.resident[page] = next_use
+        heapq.heappush(self.heap, (-next_use, page))
+
+    def loaded(self, page, frame):
+        self._advance(page)
+
+    def access(self, page, frame):
+        self._advance(page)
+
+    def evict(self):
+        heap = self.heap
+        resident = self.resident
+        while True:
+            next_use, page = heapq.heappop(heap)
+            # Skip stale heap entries left behind by later references
+            if resident.get(page) == -next_use:
+                del resident[page]
+                return page
+
+
+def make_replacement(name, future_pages=None):
+    """Build a replacement policy by name; OPT needs the future page sequence"""
+    if name == "FIFO":
+        return FIFOReplacement()
+    if name == "LRU":
+        return LRUReplacement()
+    if name == "Clock":
+        return ClockReplacement()
+    if name == "OPT":
+        if future_pages is None:
+            raise ValueError("OPT replacement needs the full trace in advance")
+        return OPTReplacement(future_pages)
+    raise ValueError(f"Unknown page replacement policy: {name}")
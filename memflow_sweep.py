@@ -0,0 +1,92 @@
+"""
+MemFlow: Virtual Memory Manager with TLB Simulation
+Multi-Configuration Sweep Runner
+"""
+
+import csv
+import json
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+from memflow_bulk import address_typecode
+from memflow_core import MemFlowCore
+from memflow_trace import BinaryTrace, open_trace_reader
+
+DEFAULT_GRID = {
+    'tlb_size': [8, 16, 32, 64, 128, 256, 512, 1024],
+    'tlb_policy': ["FIFO", "LRU"],
+    'page_size': [4096],
+}
+
+RESULT_FIELDS = ['total_accesses', 'tlb_hits', 'tlb_misses', 'tlb_hit_rate',
+                 'page_faults', 'page_fault_rate', 'evictions', 'emat']
+
+# Decoded trace, set once per worker process by _init_worker
+_trace = None
+
+
+def load_trace(path, base=10, address_bits=32):
+    """Parse a trace once into a packed address array"""
+    typecode = address_typecode(address_bits)
+    trace = open_trace_reader(path, base, max_address=2**address_bits - 1)
+    try:
+        if isinstance(trace, BinaryTrace) and trace.addresses.format == typecode:
+            # Same width: one bulk copy out of the map, no per-address work
+            addresses = array(typecode)
+            addresses.frombytes(trace.addresses.cast("B"))
+            return addresses
+        return array(typecode, trace)
+    finally:
+        trace.close()
+
+
+def expand_grid(grid):
+    """Turn {parameter: [values]} into a list of MemFlowCore keyword dicts"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in product(*(grid[key] for key in keys))]
+
+
+def _init_worker(trace):
+    global _trace
+    _trace = trace
+
+
+def run_config(config):
+    """Simulate the shared trace under one configuration"""
+    core = MemFlowCore(**config)
+    core.translate_array(_trace)
+    stats = core.stats()
+    row = dict(config)
+    row.update((field, stats[field]) for field in RESULT_FIELDS)
+    return row
+
+
+def sweep(trace, grid, workers=None):
+    """Run every configuration in grid over trace using a process pool
+
+    The decoded trace is handed to each worker once through the pool
+    initializer (inherited for free under fork) rather than with every task,
+    so configurations never re-parse or re-ship it.
+    """
+    configs = expand_grid(grid)
+    workers = min(workers or os.cpu_count() or 1, len(configs))
+    if workers <= 1:
+        _init_worker(trace)
+        return [run_config(config) for config in configs]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(trace,)) as pool:
+        return list(pool.map(run_config, configs))
+
+
+def write_results(rows, stream, fmt="csv"):
+    """Write sweep rows as CSV or JSON"""
+    if fmt == "json":
+        json.dump(rows, stream, indent=2)
+        stream.write("\n")
+        return
+    if not rows:
+        return
+    writer = csv.DictWriter(stream, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
@@ -0,0 +1,160 @@
+"""
+MemFlow: Virtual Memory Manager with TLB Simulation
+Multi-Level TLB Hierarchy
+"""
+
+from collections import OrderedDict
+
+TLB_LEVEL_NAMES = ("L1", "L1D", "L1I", "L2")
+
+
+class TLB:
+    """One TLB level, fully associative (ways=None) or N-way set-associative
+
+    Pages map to set `page % num_sets`; each set is an OrderedDict kept in
+    FIFO or LRU order, like the single-level TLB in MemFlowCore.
+    """
+
+    def __init__(self, name, entries, ways=None, policy="LRU", latency=1):
+        ways = ways or entries
+        if entries <= 0 or ways <= 0 or entries % ways:
+            raise ValueError(f"{name}: entries must be a positive multiple of ways")
+        if policy not in ("FIFO", "LRU"):
+            raise ValueError(f"{name}: unknown TLB policy {policy}")
+        if latency < 0:
+            raise ValueError("Latencies must not be negative")
+        self.name = name
+        self.entries = entries
+        self.ways = ways
+        self.num_sets = entries // ways
+        self.policy = policy
+        self.latency = latency
+        self.flush()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def organization(self):
+        if self.num_sets == 1:
+            return "fully associative"
+        return f"{self.ways}-way set-associative"
+
+    def flush(self):
+        """Drop every entry (counters are kept)"""
+        self.sets = [OrderedDict() for _ in range(self.num_sets)]
+
+    def lookup(self, page):
+        """Frame cached for page, or None; counts the hit or miss"""
+        entries = self.sets[page % self.num_sets]
+        frame = entries.get(page)
+        if frame is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.policy == "LRU":
+            entries.move_to_end(page)
+        return frame
+
+    def insert(self, page, frame):
+        entries = self.sets[page % self.num_sets]
+        if page not in entries and len(entries) >= self.ways:
+            entries.popitem(last=False)  # Remove oldest (FIFO) or LRU
+        entries[page] = frame
+
+    def invalidate(self, page):
+        self.sets[page % self.num_sets].pop(page, None)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.sets)
+
+    def items(self):
+        for entries in self.sets:
+            yield from entries.items()
+
+
+class TLBHierarchy:
+    """L1 TLB(s) in front of an optional shared L2
+
+    With a separate l1i, instruction fetches look up l1i and data accesses
+    l1d; otherwise l1d is a unified L1. An L2 hit refills the L1 it missed in;
+    a full miss means a page walk, after which fill() loads both levels.
+    """
+
+    def __init__(self, l1d, l1i=None, l2=None):
+        self.l1d = l1d
+        self.l1i = l1i
+        self.l2 = l2
+        self.levels = [level for level in (l1d, l1i, l2) if level is not None]
+
+    def l1_for(self, fetch):
+        return self.l1i if fetch and self.l1i is not None else self.l1d
+
+    def lookup(self, page, fetch=False):
+        l1 = self.l1_for(fetch)
+        frame = l1.lookup(page)
+        if frame is None and self.l2 is not None:
+            frame = self.l2.lookup(page)
+            if frame is not None:
+                l1.insert(page, frame)
+        return frame
+
+    def fill(self, page, frame, fetch=False):
+        self.l1_for(fetch).insert(page, frame)
+        if self.l2 is not None:
+            self.l2.insert(page, frame)
+
+    def invalidate(self, page):
+        for level in self.levels:
+            level.invalidate(page)
+
+    def flush(self):
+        for level in self.levels:
+            level.flush()
+
+    def reset(self):
+        self.flush()
+        for level in self.levels:
+            level.hits = level.misses = 0
+
+    def cycles(self):
+        """Cycles spent probing every level so far"""
+        return sum((level.hits + level.misses) * level.latency for level in self.levels)
+
+    def __len__(self):
+        return sum(len(level) for level in self.levels)
+
+
+def parse_tlb_spec(spec, policy="LRU"):
+    """Parse NAME=ENTRIES[xWAYS][@LATENCY], e.g. 'L1D=64x4@1' or 'L2=1536x12@7'"""
+    try:
+        name, rest = spec.split("=", 1)
+        name = name.strip().upper()
+        latency = 1
+        if "@" in rest:
+            rest, latency = rest.split("@", 1)
+            latency = int(latency)
+        ways = None
+        if "x" in rest:
+            rest, ways = rest.split("x", 1)
+            ways = int(ways)
+        entries = int(rest)
+    except ValueError:
+        raise ValueError(f"Bad TLB spec '{spec}', expected NAME=ENTRIES[xWAYS][@LATENCY]")
+    if name not in TLB_LEVEL_NAMES:
+        raise ValueError(f"Unknown TLB level '{name}', expected one of {', '.join(TLB_LEVEL_NAMES)}")
+    return TLB(name, entries, ways, policy, latency)
+
+
+def build_hierarchy(levels):
+    """Arrange parsed TLB levels (L1 or L1D, optional L1I, optional L2) into a hierarchy"""
+    by_name = {}
+    for level in levels:
+        if level.name in by_name:
+            raise ValueError(f"TLB level {level.name} given twice")
+        by_name[level.name] = level
+    if "L1" in by_name and ("L1D" in by_name or "L1I" in by_name):
+        raise ValueError("Use either a unified L1 or split L1D/L1I, not both")
+    l1d = by_name.get("L1", by_name.get("L1D"))
+    if l1d is None:
+        raise ValueError("A TLB hierarchy needs an L1 or L1D level")
+    return TLBHierarchy(l1d, by_name.get("L1I"), by_name.get("L2"))
@@ -0,0 +1,366 @@
+"""
+MemFlow: Virtual Memory Manager with TLB Simulation
+Address Trace Readers
+"""
+
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+
+ACCESS_KINDS = ("R", "W", "I")  # read, write, instruction fetch
+
+# Binary trace: a 32-byte header followed by packed little-endian columns,
+#   addresses  count x uint32 (32-bit traces) or uint64 (48/64-bit)
+#   pids       count x uint16             (if BINARY_HAS_PIDS)
+#   kinds      count x uint8, 0=R 1=W 2=I  (if BINARY_HAS_KINDS)
+# Columns rather than interleaved records keep every field a contiguous
+# array that can be used straight out of the memory map.
+BINARY_MAGIC = b"MEMFLOWT"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<8sHBBQ12x')  # magic, version, address_bits, flags, count
+BINARY_HAS_PIDS = 1
+BINARY_HAS_KINDS = 2
+_KIND_ENCODE = bytes.maketrans(b"RWI", b"\x00\x01\x02")
+_KIND_DECODE = bytes.maketrans(b"\x00\x01\x02", b"RWI")
+_LITTLE_ENDIAN_DTYPES = {'H': '<u2', 'I': '<u4', 'Q': '<u8'}
+
+
+def parse_address(token, base=10):
+    """Parse one address token; a 0x prefix always means hex"""
+    if token[:2] in ("0x", "0X"):
+        return int(token, 16)
+    return int(token, base)
+
+
+class TextTrace:
+    """Stream addresses from a text trace, one access per line
+
+    Each line is `[pid:]address [kind]`: an address, optionally prefixed by
+    the issuing process ID (0 if omitted) and followed by its access kind
+    (R, W or I for an instruction fetch; R if omitted). Lines starting with
+    # are comments. Unparseable or out-of-range lines are skipped and counted
+    in `skipped`. Iteration is lazy, so memory use stays constant regardless
+    of trace size. Iterating yields addresses only; chunks() also carries
+    kinds and process IDs.
+    """
+
+    def __init__(self, stream, base=10, max_address=None):
+        self.stream = stream
+        self.base = base
+        self.max_address = max_address
+        self.skipped = 0
+
+    def close(self):
+        if self.stream is not sys.stdin:
+            self.stream.close()
+
+    def __iter__(self):
+        base = self.base
+        max_address = self.max_address
+        for line in self.stream:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                addr = parse_address(line, base)
+            except ValueError:
+                try:
+                    addr = self._parse_tagged(line)[0]
+                except ValueError:
+                    self.skipped += 1
+                    continue
+            if addr < 0 or (max_address is not None and addr > max_address):
+                self.skipped += 1
+                continue
+            yield addr
+
+    def _parse_tagged(self, line):
+        """Slow path for "[pid:]address [kind]" lines; raises ValueError"""
+        fields = line.split()
+        if len(fields) > 2:
+            raise ValueError(line)
+        kind = fields[1].upper() if len(fields) == 2 else "R"
+        if kind not in ACCESS_KINDS:
+            raise ValueError(line)
+        pid = 0
+        token = fields[0]
+        if ':' in token:
+            pid, token = token.split(':', 1)
+            pid = int(pid)
+            if pid < 0:
+                raise ValueError(line)
+        return parse_address(token, self.base), kind, pid
+
+    def chunks(self, size, typecode='Q'):
+        """Yield (addresses, kinds, pids) with up to size accesses each
+
+        addresses is an array of the given typecode. kinds and pids are
+        parallel lists, or None while every line of the chunk is a plain
+        address (a read by process 0), so untagged traces pay nothing for them.
+        """
+        base = self.base
+        max_address = self.max_address
+        addresses = array(typecode)
+        kinds = pids = None
+        for line in self.stream:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                addr = parse_address(line, base)
+                kind = "R"
+                pid = 0
+            except ValueError:
+                try:
+                    addr, kind, pid = self._parse_tagged(line)
+                except ValueError:
+                    self.skipped += 1
+                    continue
+                if kinds is None:
+                    kinds = ["R"] * len(addresses)
+                    pids = [0] * len(addresses)
+            if addr < 0 or (max_address is not None and addr > max_address):
+                self.skipped += 1
+                continue
+
+            addresses.append(addr)
+            if kinds is not None:
+                kinds.append(kind)
+                pids.append(pid)
+            if len(addresses) >= size:
+                yield addresses, kinds, pids
+                addresses = array(typecode)
+                kinds = pids = None
+        if addresses:
+            yield addresses, kinds, pids
+
+
+def open_trace(path):
+    """Open a trace file for streaming; '-' reads standard input"""
+    if path == '-':
+        return sys.stdin
+    return open(path, 'r', buffering=1 << 20)
+
+
+def is_binary_trace(path):
+    """True if path starts with the binary trace magic"""
+    if path == '-':
+        return False
+    with open(path, 'rb') as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def open_trace_reader(path, base=10, max_address=None):
+    """Open a binary or text trace as a BinaryTrace or TextTrace
+
+    Both yield addresses when iterated and (addresses, kinds, pids) from
+    chunks(), and must be closed. base only applies to text traces.
+    """
+    if is_binary_trace(path):
+        return BinaryTrace(path, max_address)
+    return TextTrace(open_trace(path), base, max_address)
+
+
+def read_addresses(path, base=10, max_address=None):
+    """Yield the addresses of a binary or text trace file, closing it when done"""
+    trace = open_trace_reader(path, base, max_address)
+    try:
+        yield from trace
+    finally:
+        trace.close()
+
+
+class BinaryTrace:
+    """Memory-mapped binary trace whose columns are zero-copy views
+
+    Opening only reads the header; pages of the file are brought in by the
+    OS as the simulation reaches them, so multi-GB traces open instantly.
+    """
+
+    skipped = 0  # binary records are validated when written
+
+    def __init__(self, path, max_address=None):
+        self.path = path
+        self.file = open(path, 'rb')
+        try:
+            header = self.file.read(BINARY_HEADER.size)
+            if len(header) < BINARY_HEADER.size:
+                raise ValueError(f"{path}: truncated binary trace header")
+            magic, version, address_bits, flags, count = BINARY_HEADER.unpack(header)
+            if magic != BINARY_MAGIC:
+                raise ValueError(f"{path}: not a MemFlow binary trace")
+            if version != BINARY_VERSION:
+                raise ValueError(f"{path}: unsupported binary trace version {version}")
+            if max_address is not None and 2**address_bits - 1 > max_address:
+                raise ValueError(f"{path}: trace has {address_bits}-bit addresses, "
+                                 f"wider than the simulated address space")
+            typecode = 'I' if address_bits <= 32 else 'Q'
+            width = 4 if typecode == 'I' else 8
+            size = (BINARY_HEADER.size + count * width
+                    + (count * 2 if flags & BINARY_HAS_PIDS else 0)
+                    + (count if flags & BINARY_HAS_KINDS else 0))
+            self.file.seek(0, 2)
+            if self.file.tell() < size:
+                raise ValueError(f"{path}: binary trace is truncated")
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if count else None
+        except BaseException:
+            self.file.close()
+            raise
+
+        self.address_bits = address_bits
+        self.count = count
+        self.pids = self.kinds = None
+        if not count:
+            self.addresses = memoryview(array(typecode))
+            return
+        view = memoryview(self.map)
+        offset = BINARY_HEADER.size
+        self.addresses = self._column(view, offset, count * width, typecode)
+        offset += count * width
+        if flags & BINARY_HAS_PIDS:
+            self.pids = self._column(view, offset, count * 2, 'H')
+            offset += count * 2
+        if flags & BINARY_HAS_KINDS:
+            self.kinds = view[offset:offset + count]
+
+    @staticmethod
+    def _column(view, offset, nbytes, typecode):
+        column = view[offset:offset + nbytes]
+        if sys.byteorder == 'little':
+            return column.cast(typecode)
+        values = array(typecode, column.tobytes())  # big-endian hosts pay for a swapped copy
+        values.byteswap()
+        return memoryview(values)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.addresses)
+
+    def chunks(self, size, typecode=None):
+        """Yield (addresses, kinds, pids) like TextTrace.chunks
+
+        addresses are memoryview slices of the map (typecode is ignored:
+        the file fixes the width). kinds come back as a str of R/W/I.
+        """
+        for start in range(0, self.count, size):
+            end = min(start + size, self.count)
+            kinds = pids = None
+            if self.kinds is not None:
+                kinds = self.kinds[start:end].tobytes().translate(_KIND_DECODE).decode('ascii')
+            if self.pids is not None:
+                pids = self.pids[start:end].tolist()
+            if kinds is not None and pids is None:
+                pids = [0] * (end - start)
+            elif pids is not None and kinds is None:
+                kinds = "R" * (end - start)
+            yield self.addresses[start:end], kinds, pids
+
+    def close(self):
+        # Views must be released before the map can be closed
+        for view in (self.addresses, self.pids, self.kinds):
+            if view is not None:
+                view.release()
+        if self.map is not None:
+            try:
+                self.map.close()
+            except BufferError:
+                pass  # a caller still holds a chunk; the map closes when it is freed
+        self.file.close()
+
+
+def _write_zeros(stream, nbytes, block=1 << 20):
+    zeros = bytes(min(nbytes, block))
+    while nbytes > 0:
+        stream.write(zeros[:nbytes])
+        nbytes -= len(zeros)
+
+
+def _column_bytes(values, typecode):
+    """Little-endian bytes of a column given as an array, NumPy array or sequence"""
+    if hasattr(values, 'dtype'):
+        return values.astype(_LITTLE_ENDIAN_DTYPES[typecode], copy=False).tobytes()
+    if not isinstance(values, array) or values.typecode != typecode:
+        values = array(typecode, values)
+    elif sys.byteorder != 'little':
+        values = array(typecode, values)  # don't swap the caller's array in place
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_binary_trace(path, chunks, address_bits=32):
+    """Write (addresses, kinds, pids) chunks as a binary trace in one pass
+
+    Chunks follow the TextTrace.chunks() convention; kinds and pids may be
+    None. Pid and kind columns are only stored if some chunk carries them.
+    Returns the number of records written.
+    """
+    typecode = 'I' if address_bits <= 32 else 'Q'
+    with open(path, 'wb') as out, tempfile.TemporaryFile() as pid_spool, \
+            tempfile.TemporaryFile() as kind_spool:
+        out.write(bytes(BINARY_HEADER.size))
+        count = 0
+        tagged_from = None  # records before the first tagged chunk get pid 0, kind R
+        for addresses, kinds, pids in chunks:
+            n = len(addresses)
+            if (kinds is not None or pids is not None) and tagged_from is None:
+                tagged_from = count
+            if tagged_from is not None:
+                if pids is None:
+                    _write_zeros(pid_spool, 2 * n)
+                else:
+                    try:
+                        pid_spool.write(_column_bytes(pids, 'H'))
+                    except OverflowError:
+                        raise ValueError("Process IDs above 65535 do not fit the binary trace format")
+                if kinds is None:
+                    _write_zeros(kind_spool, n)
+                else:
+                    kind_spool.write("".join(kinds).encode('ascii').translate(_KIND_ENCODE))
+            out.write(_column_bytes(addresses, typecode))
+            count += n
+
+        flags = 0
+        if tagged_from is not None:
+            flags = BINARY_HAS_PIDS | BINARY_HAS_KINDS
+            for spool, width in ((pid_spool, 2), (kind_spool, 1)):
+                _write_zeros(out, tagged_from * width)
+                spool.seek(0)
+                shutil.copyfileobj(spool, out, 1 << 20)
+        out.seek(0)
+        out.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, address_bits, flags, count))
+    return count
+
+
+def write_text_trace(path, chunks):
+    """Write (addresses, kinds, pids) chunks as a text trace; returns the record count"""
+    count = 0
+    with open(path, 'w', buffering=1 << 20) as out:
+        for addresses, kinds, pids in chunks:
+            addresses = addresses.tolist()
+            if pids is not None:
+                addresses = [f"{pid}:{addr}" for pid, addr in zip(pids, addresses)]
+            if kinds is not None:
+                lines = [f"{addr} {kind}" for addr, kind in zip(addresses, kinds)]
+            else:
+                lines = map(str, addresses)
+            out.write("\n".join(lines))
+            out.write("\n")
+            count += len(addresses)
+    return count
+
+
+def convert_text_trace(src, dst, base=10, address_bits=32, chunk_size=1 << 20):
+    """Convert a text trace to the binary format; returns (records, lines skipped)"""
+    typecode = 'I' if address_bits <= 32 else 'Q'
+    trace = TextTrace(open_trace(src), base, 2**address_bits - 1)
+    try:
+        count = write_binary_trace(dst, trace.chunks(chunk_size, typecode), address_bits)
+    finally:
+        trace.close()
+    return count, trace.skipped
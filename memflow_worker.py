@@ -0,0 +1,77 @@
+"""
+MemFlow: Virtual Memory Manager with TLB Simulation
+Background Simulation Worker
+"""
+
+import threading
+import time
+from itertools import islice
+
+
+class SimulationWorker(threading.Thread):
+    """Run a simulation off the UI thread, posting progress to a queue
+
+    Addresses are translated in chunks while holding `lock`, so the UI can
+    take the same lock to read a consistent snapshot of the core and history
+    between chunks. Messages put on `events`:
+
+        ('progress', processed, last_result)
+        ('done', processed, cancelled, error)
+    """
+
+    def __init__(self, core, history, lock, addresses, events, chunk_size=4096, step_delay=0, analyzer=None):
+        super().__init__(daemon=True)
+        self.core = core
+        self.history = history
+        self.lock = lock
+        self.addresses = addresses
+        self.events = events
+        self.chunk_size = chunk_size
+        self.step_delay = step_delay
+        self.analyzer = analyzer
+        self.resume_event = threading.Event()
+        self.resume_event.set()
+        self.cancel_event = threading.Event()
+
+    @property
+    def paused(self):
+        return not self.resume_event.is_set()
+
+    def pause(self):
+        self.resume_event.clear()
+
+    def resume(self):
+        self.resume_event.set()
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.resume_event.set()  # wake a paused worker so it can exit
+
+    def run(self):
+        processed = 0
+        error = None
+        addresses = iter(self.addresses)
+        try:
+            while not self.cancel_event.is_set():
+                self.resume_event.wait()
+                if self.cancel_event.is_set():
+                    break
+                chunk = list(islice(addresses, self.chunk_size))
+                if not chunk:
+                    break
+                with self.lock:
+                    results = self.core.translate_many(chunk, collect=True)
+                    self.history.extend(time.time(), results)
+                    if self.analyzer is not None:
+                        self.analyzer.feed(chunk, self.core.PAGE_SHIFT)
+                processed += len(chunk)
+                self.events.put(('progress', processed, results[-1]))
+                if self.step_delay:
+                    time.sleep(self.step_delay)
+        except Exception as e:
+            error = e
+        finally:
+            close = getattr(self.addresses, 'close', None)
+            if close is not None:
+                close()
+            self.events.put(('done', processed, self.cancel_event.is_set(), error))
@@ -0,0 +1,237 @@
+"""
+MemFlow: Virtual Memory Manager with TLB Simulation
+Synthetic Workload Generators
+
+Each workload produces its addresses with NumPy in fixed-size blocks. Block
+i draws from a generator seeded with (seed, i), so a seed always yields the
+same trace no matter how it is chunked, and shorter traces are prefixes of
+longer ones.
+"""
+
+from memflow_bulk import HAVE_NUMPY, address_dtype, np
+
+WORKLOADS = ("uniform", "sequential", "strided", "loop", "zipf", "phases")
+BLOCK = 1 << 16  # addresses per independently seeded block
+# Pattern-specific keyword arguments accepted by make_workload
+WORKLOAD_PARAMETERS = {
+    "uniform": ("region", "base"),
+    "sequential": ("stride", "region", "base"),
+    "strided": ("stride", "region", "base"),
+    "loop": ("stride", "region", "base"),
+    "zipf": ("pages", "s"),
+    "phases": ("working_set", "phase_length"),
+}
+_BLOCK_STREAM, _PAGES_STREAM, _PHASE_STREAM = 0, 1, 2  # keep the seeded streams apart
+
+
+class Workload:
+    """Seeded, vectorized address stream of `count` accesses
+
+    Subclasses implement _generate(rng, start, n), returning the n addresses
+    at positions start..start+n-1 as a uint64 array.
+    """
+
+    name = None
+
+    def __init__(self, count, address_bits=32, page_size=4096, write_ratio=0.0, seed=None):
+        if not HAVE_NUMPY:
+            raise RuntimeError("Synthetic workloads require NumPy")
+        if count < 0:
+            raise ValueError("Access count must not be negative")
+        if not 0 <= write_ratio <= 1:
+            raise ValueError("Write ratio must be between 0 and 1")
+        if page_size <= 0 or page_size & (page_size - 1):
+            raise ValueError("Page size must be a power of two")
+        if seed is not None and seed < 0:
+            raise ValueError("Seed must not be negative")
+        self.count = count
+        self.address_bits = address_bits
+        self.address_space = 2**address_bits
+        self.page_size = page_size
+        self.write_ratio = write_ratio
+        # Keep the drawn seed so an unseeded run can be reproduced
+        self.seed = np.random.SeedSequence(seed).entropy if seed is None else seed
+
+    def _rng(self, *key):
+        return np.random.default_rng([self.seed, *key])
+
+    def _generate(self, rng, start, n):
+        raise NotImplementedError
+
+    def _blocks(self):
+        # Whole blocks are always drawn, so a shorter trace is a prefix of a longer one
+        for index, start in enumerate(range(0, self.count, BLOCK)):
+            n = min(BLOCK, self.count - start)
+            rng = self._rng(_BLOCK_STREAM, index)
+            addresses = self._generate(rng, start, BLOCK)[:n]
+            kinds = None
+            if self.write_ratio:
+                writes = rng.random(BLOCK)[:n] < self.write_ratio
+                kinds = np.where(writes, ord("W"), ord("R")).astype(np.uint8).tobytes().decode('ascii')
+            yield addresses, kinds
+
+    def chunks(self, size=1 << 20):
+        """Yield (addresses, kinds, pids) like TextTrace.chunks
+
+        addresses is a NumPy uint32/uint64 array; kinds is a str of R/W when
+        write_ratio is set, else None; pids is always None (process 0).
+        """
+        # Checked here rather than in the generator so bad sizes fail before
+        # any output is opened
+        if size <= 0:
+            raise ValueError("Chunk size must be positive")
+        return self._chunks(size)
+
+    def _chunks(self, size):
+        dtype = address_dtype(self.address_bits)
+        pending, pending_kinds, held = [], [], 0
+        blocks = self._blocks()
+        done = False
+        while not done:
+            block = next(blocks, None)
+            if block is not None:
+                pending.append(block[0])
+                pending_kinds.append(block[1] or "")
+                held += len(block[0])
+                if held < size:
+                    continue
+            else:
+                done = True
+            merged = np.concatenate(pending) if pending else np.empty(0, dtype=np.uint64)
+            merged_kinds = "".join(pending_kinds)
+            cut = held if done else held - held % size
+            for lo in range(0, cut, size):
+                kinds = merged_kinds[lo:lo + size] if self.write_ratio else None
+                yield merged[lo:lo + size].astype(dtype), kinds, None
+            pending, pending_kinds, held = [merged[cut:]], [merged_kinds[cut:]], held - cut
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for addresses, _, _ in self.chunks(BLOCK):
+            yield from addresses.tolist()
+
+
+class UniformWorkload(Workload):
+    """Addresses drawn uniformly from [base, base + region)"""
+
+    name = "uniform"
+
+    def __init__(self, count, region=None, base=0, **options):
+        super().__init__(count, **options)
+        self.region = region or self.address_space - base
+        self.base = base
+        _check_region(self, base, self.region)
+
+    def _generate(self, rng, start, n):
+        return np.uint64(self.base) + rng.integers(0, self.region, n, dtype=np.uint64)
+
+
+class StrideWorkload(Workload):
+    """base + (i * stride) mod region: scans, strided walks and loops over an array
+
+    Registered as "sequential" (word stride over the whole address space),
+    "strided" (page stride) and "loop" (cache-line stride over a 1MB array).
+    """
+
+    def __init__(self, count, stride=None, region=None, base=0, name="sequential", **options):
+        super().__init__(count, **options)
+        self.name = name
+        defaults = {"sequential": (8, None), "strided": (self.page_size, None), "loop": (64, 1 << 20)}
+        default_stride, default_region = defaults[name]
+        self.stride = stride or default_stride
+        self.region = region or default_region or self.address_space - base
+        self.base = base
+        if self.stride <= 0:
+            raise ValueError("Stride must be positive")
+        _check_region(self, base, self.region)
+
+    def _generate(self, rng, start, n):
+        offsets = np.arange(start, start + n, dtype=np.uint64) * np.uint64(self.stride)
+        if self.region < 2**64:  # a full 64-bit region wraps by itself
+            offsets %= np.uint64(self.region)
+        return np.uint64(self.base) + offsets
+
+
+class ZipfWorkload(Workload):
+    """Page popularity follows Zipf's law: page of rank k is hit in proportion to 1/k**s
+
+    The `pages` distinct pages (default 65536, or every page of a smaller
+    address space) are scattered over the address space (chosen once from
+    the seed), and the offset within a page is uniform.
+    """
+
+    name = "zipf"
+
+    def __init__(self, count, pages=None, s=1.0, **options):
+        super().__init__(count, **options)
+        num_pages = self.address_space // self.page_size
+        if pages is None:
+            pages = min(65536, num_pages)
+        if not 0 < pages <= num_pages:
+            raise ValueError(f"Zipf page count must be between 1 and {num_pages}")
+        if s <= 0:
+            raise ValueError("Zipf exponent must be positive")
+        self.pages = pages
+        self.s = s
+        weights = np.arange(1, pages + 1, dtype=np.float64) ** -s
+        self.cdf = np.cumsum(weights / weights.sum())
+        self.cdf[-1] = 1.0
+        self.page_numbers = self._rng(_PAGES_STREAM).choice(num_pages, pages, replace=False).astype(np.uint64)
+
+    def _generate(self, rng, start, n):
+        ranks = np.searchsorted(self.cdf, rng.random(n), side='right')
+        offsets = rng.integers(0, self.page_size, n, dtype=np.uint64)
+        return (self.page_numbers[ranks] << np.uint64(self.page_size.bit_length() - 1)) | offsets
+
+
+class PhaseWorkload(Workload):
+    """Working-set phases: every phase_length accesses the program moves to a
+    fresh set of working_set random pages and touches them uniformly"""
+
+    name = "phases"
+
+    def __init__(self, count, working_set=64, phase_length=100000, **options):
+        super().__init__(count, **options)
+        num_pages = self.address_space // self.page_size
+        if not 0 < working_set <= num_pages:
+            raise ValueError(f"Working set must be between 1 and {num_pages} pages")
+        if phase_length <= 0:
+            raise ValueError("Phase length must be positive")
+        self.working_set = working_set
+        self.phase_length = phase_length
+        self.num_pages = num_pages
+
+    def _phase_pages(self, phase):
+        return self._rng(_PHASE_STREAM, phase).choice(self.num_pages, self.working_set, replace=False).astype(np.uint64)
+
+    def _generate(self, rng, start, n):
+        shift = np.uint64(self.page_size.bit_length() - 1)
+        picks = rng.integers(0, self.working_set, n)
+        offsets = rng.integers(0, self.page_size, n, dtype=np.uint64)
+        addresses = np.empty(n, dtype=np.uint64)
+        first, last = start // self.phase_length, (start + n - 1) // self.phase_length
+        for phase in range(first, last + 1):
+            lo = max(phase * self.phase_length - start, 0)
+            hi = min((phase + 1) * self.phase_length - start, n)
+            addresses[lo:hi] = self._phase_pages(phase)[picks[lo:hi]] << shift
+        return addresses | offsets
+
+
+def _check_region(workload, base, region):
+    if base < 0 or region <= 0 or base + region > workload.address_space:
+        raise ValueError("Workload region must lie inside the virtual address space")
+
+
+def make_workload(name, count, **options):
+    """Build a workload by name; options are the pattern's keyword arguments"""
+    if name == "uniform":
+        return UniformWorkload(count, **options)
+    if name in ("sequential", "strided", "loop"):
+        return StrideWorkload(count, name=name, **options)
+    if name == "zipf":
+        return ZipfWorkload(count, **options)
+    if name == "phases":
+        return PhaseWorkload(count, **options)
+    raise ValueError(f"Unknown workload: {name}")